@@ -1,29 +1,60 @@
 from config import app_config
 import logging
 import os
+import sqlite3
 from logging.handlers import RotatingFileHandler
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 # local imports
 
-# db variable initialization
-db = SQLAlchemy()
+# db variable initialization. Objects are not expired on commit, so reading
+# one afterwards does not select it again; code that needs what the
+# database changed reads it back itself.
+db = SQLAlchemy(session_options={'expire_on_commit': False})
+
+
+def enforce_foreign_keys(dbapi_connection, connection_record):
+    # SQLite leaves foreign keys, and so ON DELETE CASCADE, off unless each
+    # connection turns them on
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
 
 
 def create_app(config_name):
     app = Flask(__name__)
     app.config.from_object(app_config[config_name])
     db.init_app(app)
+    if not event.contains(Engine, 'connect', enforce_foreign_keys):
+        event.listen(Engine, 'connect', enforce_foreign_keys)
 
     migrate = Migrate(app, db, compare_type=True)
 
-    from .models import user, rectangle, square, triangle, diamond
+    from .auth import cache, signed
+    cache.init_app(app)
+    signed.init_app(app)
+
+    from .models import user, rectangle, square, triangle, diamond, job
 
     from .api import api as api_blueprint
     app.register_blueprint(api_blueprint, url_prefix='/api')
 
+    from . import compression, jobs, links, payloads
+    compression.init_app(app)
+    # after_request functions run last registered first, so a response's
+    # ETag gets its format before compression adds the coding
+    payloads.init_app(app)
+    links.init_app(app)
+    jobs.init_app(app)
+
+    from . import cli
+    cli.register(app)
+
     if not app.debug and not app.testing:
         if not os.path.exists('logs'):
             os.mkdir('logs')
@@ -2,4 +2,4 @@ from flask import Blueprint
 
 api = Blueprint('api', __name__)
 
-from . import users, errors, tokens, rectangles, squares, triangles, diamonds  # nopep8
+from . import users, errors, tokens, shapes, compute, imports, jobs  # nopep8
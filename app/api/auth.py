@@ -1,4 +1,9 @@
+from datetime import datetime
+from flask import current_app
 from flask_httpauth import HTTPBasicAuth, HTTPTokenAuth
+from .. import db
+from ..auth.cache import Principal, token_cache
+from ..auth.signed import is_signed_token, signed_tokens
 from ..models.user import User
 from .errors import error_response
 
@@ -10,6 +15,9 @@ token_auth = HTTPTokenAuth()
 def verify_password(user_name, password):
     user = User.query.filter_by(user_name=user_name).first()
     if user and user.verify_password(password):
+        if user.password_needs_rehash():
+            user.set_password(password)
+            db.session.commit()
         return user
 
 
@@ -20,7 +28,22 @@ def basic_auth_error(status):
 
 @token_auth.verify_token
 def verify_token(token):
-    return User.check_token(token) if token else None
+    if not token:
+        return None
+    if current_app.config['TOKEN_MODE'] == 'signed' and is_signed_token(token):
+        return signed_tokens().verify(token)
+    cache = token_cache()
+    principal = cache.get(token)
+    if principal is not None:
+        return principal
+    # Only the columns needed to authenticate, not the whole user row
+    row = db.session.query(User.user_id, User.token_expiration).filter_by(
+        token=token).first()
+    if row is None or row.token_expiration < datetime.utcnow():
+        return None
+    principal = Principal(user_id=row.user_id)
+    cache.set(token, principal, expires_at=row.token_expiration)
+    return principal
 
 
 @token_auth.error_handler
@@ -0,0 +1,46 @@
+from flask import current_app
+from ..payloads import get_payload, respond
+from .. import db
+from .auth import token_auth
+from .errors import bad_request, error_response
+
+# Rows per multi-row INSERT statement
+INSERT_CHUNK_SIZE = 500
+
+
+def create_batch(model, validate):
+    """
+    Validate a JSON array of shapes with the single-create rules and insert
+    all of them in one transaction, using multi-row INSERT statements.
+    Nothing is inserted unless every shape is valid.
+    """
+    user_id = token_auth.current_user().user_id
+    plural = model.plural
+    data = get_payload()
+    if not isinstance(data, list) or not data:
+        return bad_request('must be a non-empty list of ' + plural)
+    max_size = current_app.config['MAX_BATCH_SIZE']
+    if len(data) > max_size:
+        return bad_request('must include at most {} {}'.format(max_size, plural))
+    errors = []
+    for index, item in enumerate(data):
+        error = validate(item) if isinstance(item, dict) else 'must be an object'
+        if error:
+            errors.append({'index': index, 'message': error})
+    if errors:
+        return error_response(400, 'batch contains invalid ' + plural, errors)
+    rows = []
+    for item in data:
+        values = [item[field] for field in model.dimensions]
+        row = model.columns(dict(zip(model.dimensions, values)))
+        row['area'], row['perimeter'] = model.measure(*values)
+        row.update(model.discriminate(row), user_id=user_id)
+        rows.append(row)
+    table = model.__table__
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        db.session.execute(table.insert().values(
+            rows[start:start + INSERT_CHUNK_SIZE]))
+    db.session.commit()
+    response = respond({'created': len(rows)})
+    response.status_code = 201
+    return response
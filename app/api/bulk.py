@@ -0,0 +1,139 @@
+import operator
+from flask import current_app
+from ..payloads import get_payload, respond
+from sqlalchemy import case, func
+from .. import db
+from .auth import token_auth
+from .errors import bad_request
+
+FILTER_OPERATORS = {
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'lt': operator.lt,
+    'le': operator.le,
+    'gt': operator.gt,
+    'ge': operator.ge
+}
+
+
+def is_number(value):
+    return type(value) == int or type(value) == float
+
+
+def bulk_query(model, data):
+    """
+    Build the query for the current user's shapes named by a bulk request,
+    either by an `ids` list or by a `filter` on dimensions such as
+    {"width": {"lt": 2}}. Returns the query and an error message.
+    """
+    key, fields = model.key(), model.dimensions
+    query = model.owned_by(token_auth.current_user().user_id)
+    if ('ids' in data) == ('filter' in data):
+        return None, 'must include either ids or filter'
+    if 'ids' in data:
+        ids = data['ids']
+        if not isinstance(ids, list) or not ids or any(type(id) != int for id in ids):
+            return None, 'ids must be a non-empty list of integers'
+        if len(ids) > current_app.config['MAX_BATCH_SIZE']:
+            return None, 'must include at most {} ids'.format(
+                current_app.config['MAX_BATCH_SIZE'])
+        return query.filter(key.in_(ids)), None
+    if not isinstance(data['filter'], dict):
+        return None, 'filter must be an object'
+    for field, conditions in data['filter'].items():
+        if field not in fields:
+            return None, 'cannot filter on ' + field
+        if not isinstance(conditions, dict):
+            return None, 'filter on {} must be an object'.format(field)
+        for name, value in conditions.items():
+            if name not in FILTER_OPERATORS:
+                return None, 'unknown filter operator ' + name
+            if not is_number(value):
+                return None, 'filter values must be numbers'
+            query = query.filter(
+                FILTER_OPERATORS[name](getattr(model, field), value))
+    return query, None
+
+
+def assignments(model, changes):
+    """
+    The SET clause, in order, of an UPDATE giving shapes the dimension values
+    in `changes`, which may be SQL expressions. The measures, discriminator
+    and version are recomputed by the same statement.
+    """
+    dimensions = [changes.get(field, getattr(model, field))
+                  for field in model.dimensions]
+    columns = model.columns(changes)
+    if all(is_number(value) for value in dimensions):
+        # Every dimension is known, so measure it as a new shape is measured
+        area, perimeter = model.measure(*dimensions)
+        discriminators = model.discriminate(columns)
+    else:
+        # MySQL evaluates assignments left to right and lets later ones see
+        # the new values, so the measures and discriminator come first and
+        # are computed from the old dimensions, like every other database does
+        area, perimeter = model.measure(*dimensions, sqrt=func.sqrt)
+        # A rectangle whose sides become equal turns into a square, and back
+        discriminators = model.discriminate(
+            dict(model.__table__.columns.items(), **columns),
+            where=lambda condition, a, b: case([(condition, a)], else_=b))
+    values = [(model.area, area), (model.perimeter, perimeter),
+              (model.version, model.version + 1)]
+    values += [(getattr(model, column), value)
+               for column, value in discriminators.items()]
+    values += [(getattr(model, column), value)
+               for column, value in columns.items()]
+    return values
+
+
+def bulk_update(model):
+    """
+    Set dimensions to new values ("set") or multiply them by a factor
+    ("scale") with a single UPDATE statement, without loading any shape.
+    The stored area and perimeter are recomputed by the same statement.
+    """
+    data = get_payload()
+    if not isinstance(data, dict):
+        return bad_request('must be an object')
+    query, error = bulk_query(model, data)
+    if error:
+        return bad_request(error)
+    fields = model.dimensions
+    new_values = data.get('set', {})
+    factors = data.get('scale', {})
+    if not isinstance(new_values, dict) or not isinstance(factors, dict):
+        return bad_request('set and scale must be objects')
+    if not new_values and not factors:
+        return bad_request('must include set or scale')
+    changes = {}
+    for field, value in new_values.items():
+        if field not in fields:
+            return bad_request('cannot set ' + field)
+        if not is_number(value) or value <= 0:
+            return bad_request(field + ' must be a positive number')
+        changes[field] = value
+    for field, factor in factors.items():
+        if field not in fields or field in new_values:
+            return bad_request('cannot scale ' + field)
+        if not is_number(factor) or factor <= 0:
+            return bad_request('scale factors must be positive numbers')
+        changes[field] = getattr(model, field) * factor
+    updated = query.update(assignments(model, changes), synchronize_session=False,
+                           update_args={'preserve_parameter_order': True})
+    db.session.commit()
+    return respond({'updated': updated})
+
+
+def bulk_delete(model):
+    """
+    Delete the selected shapes with a single DELETE statement
+    """
+    data = get_payload()
+    if not isinstance(data, dict):
+        return bad_request('must be an object')
+    query, error = bulk_query(model, data)
+    if error:
+        return bad_request(error)
+    deleted = query.delete(synchronize_session=False)
+    db.session.commit()
+    return respond({'deleted': deleted})
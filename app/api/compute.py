@@ -0,0 +1,53 @@
+import numpy as np
+from flask import current_app
+from ..payloads import get_payload, respond
+from . import api
+from .auth import token_auth
+from .errors import bad_request
+from .shapes import SHAPES
+
+
+def to_list(values):
+    # Sides that cannot form a shape (e.g. 1, 1, 5 for a triangle) give NaN,
+    # which JSON cannot represent
+    if np.isnan(values).any():
+        values = np.where(np.isnan(values), None, values)
+    return values.tolist()
+
+
+@api.route('/compute/<string:shape>', methods=['POST'])
+@token_auth.login_required
+def compute(shape):
+    models = {model.plural: model for model in SHAPES.values()}
+    if shape not in models:
+        return bad_request('unknown shape ' + shape)
+    model = models[shape]
+    fields = model.dimensions
+    data = get_payload() or {}
+    if not isinstance(data, dict) or any(field not in data for field in fields):
+        return bad_request('must include {} fields'.format(', '.join(fields)))
+    columns = []
+    for field in fields:
+        column = np.asarray(data[field])
+        if column.ndim != 1 or column.dtype.kind not in 'iuf':
+            return bad_request('{} must be a list of numbers'.format(field))
+        columns.append(column.astype(np.float64, copy=False))
+    size = len(columns[0])
+    if any(len(column) != size for column in columns):
+        return bad_request('{} must have the same length'.format(', '.join(fields)))
+    if size > current_app.config['MAX_COMPUTE_SIZE']:
+        return bad_request('must include at most {} {}'.format(
+            current_app.config['MAX_COMPUTE_SIZE'], shape))
+    for field, column in zip(fields, columns):
+        # The stdlib decoder reads a number too large for a float, like
+        # 1e400, as infinity
+        if not np.isfinite(column).all():
+            return bad_request('{} must be finite'.format(field))
+    if any((column <= 0).any() for column in columns):
+        return bad_request('{} must be positive'.format(', '.join(fields)))
+    with np.errstate(invalid='ignore'):
+        areas, perimeters = model.measure(*columns, sqrt=np.sqrt)
+    return respond({
+        'area': to_list(areas),
+        'perimeter': to_list(perimeters)
+    })
@@ -0,0 +1,102 @@
+import re
+from flask import current_app, request
+from ..compression import CODINGS, available_codings
+from ..payloads import MSGPACK_MIMETYPES, msgpack, respond, response_mimetype
+from .errors import error_response
+
+
+# The part of a tag naming a sparse fieldset, which field names never end
+FIELDSET = re.compile(r';[^-]*')
+
+
+def make_etag(values, fields=None, links=True):
+    """
+    A strong entity tag from a resource's id and version, and the `fields`
+    and `links` of a sparse representation of it, which has other bytes
+    """
+    tag = '-'.join(str(value) for value in values)
+    if fields is not None:
+        tag += ';fields=' + ','.join(sorted(set(fields)))
+    if not links:
+        tag += ';nolinks'
+    return tag
+
+
+def etag_variants(tag):
+    """
+    `tag` and the tags a response with it gets as MessagePack or when
+    compressed, which clients may send back in If-None-Match or If-Match
+    """
+    tags = [tag, tag + '-msgpack']
+    return tags + ['{}-{}'.format(tag, coding) for tag in tags for coding in CODINGS]
+
+
+def negotiated_variants(tag):
+    """
+    The tags, out of `etag_variants(tag)`, that the response to this
+    request may get: MessagePack if it accepts that rather than JSON, else
+    JSON, with the content coding it accepts or, when too small to be
+    compressed, without
+    """
+    if response_mimetype() in MSGPACK_MIMETYPES:
+        return [tag + '-msgpack']
+    coding = request.accept_encodings.best_match(available_codings())
+    return [tag] + (['{}-{}'.format(tag, coding)] if coding else [])
+
+
+def not_modified(tag):
+    """
+    304 Not Modified with `tag` and the Vary header the full response
+    would have
+    """
+    response = current_app.response_class(status=304)
+    response.set_etag(tag)
+    if msgpack is not None:
+        response.vary.add('Accept')
+    if response_mimetype() not in MSGPACK_MIMETYPES:
+        response.vary.add('Accept-Encoding')
+    return response
+
+
+def conditional_get(query, tag_columns, render, fields=None, links=True):
+    """
+    Respond with `render(row)` for the row of `query` and an ETag made of
+    `tag_columns` and the sparse fieldset. When If-None-Match already holds
+    the current ETag of the representation this request would get, respond
+    304 after selecting only the tag columns, without loading or
+    serializing the row.
+    """
+    if request.if_none_match:
+        tag = make_etag(query.with_entities(*tag_columns).first_or_404(),
+                        fields, links)
+        for variant in negotiated_variants(tag):
+            if request.if_none_match.contains_weak(variant):
+                return not_modified(variant)
+    row = query.first_or_404()
+    response = respond(render(row))
+    response.set_etag(make_etag([getattr(row, column.key)
+                                 for column in tag_columns], fields, links))
+    return response
+
+
+def if_match_versions(ids):
+    """
+    The versions of the resource with these ids that the If-Match header
+    names, by any ETag its responses get, sparse ones included, or None if
+    any version will do
+    """
+    if not request.if_match or request.if_match.star_tag:
+        return None
+    prefix = make_etag(ids) + '-'
+    versions = set()
+    for tag in request.if_match.as_set():
+        tag = FIELDSET.sub('', tag)
+        version = tag[len(prefix):].split('-', 1)[0]
+        if (tag.startswith(prefix) and version.isdigit()
+                and tag in etag_variants(make_etag(tuple(ids) + (int(version),)))):
+            versions.add(int(version))
+    return versions
+
+
+def resource_modified():
+    return error_response(412, 'resource has been modified')
@@ -1,15 +1,36 @@
-from flask import jsonify
+from sqlalchemy.orm.exc import StaleDataError
 from werkzeug.http import HTTP_STATUS_CODES
+from ..auth.passwords import HasherBusy
+from ..payloads import respond
+from .. import db
+from . import api
 
 
 def bad_request(message):
     return error_response(400, message)
 
 
-def error_response(status_code, message=None):
+def error_response(status_code, message=None, errors=None):
     payload = {'error': HTTP_STATUS_CODES.get(status_code, 'Unknown error')}
     if message:
         payload['message'] = message
-    response = jsonify(payload)
+    if errors:
+        payload['errors'] = errors
+    response = respond(payload)
     response.status_code = status_code
     return response
+
+
+@api.errorhandler(StaleDataError)
+def stale_data(error):
+    # Another request updated the same row since it was loaded
+    db.session.rollback()
+    return error_response(412, 'resource has been modified')
+
+
+@api.errorhandler(HasherBusy)
+def hasher_busy(error):
+    response = error_response(
+        503, 'too many password checks in progress, please retry')
+    response.headers['Retry-After'] = '1'
+    return response
@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+from sqlalchemy import select, text
+from .. import db
+from ..payloads import json_provider
+from .shapes import table_models
+
+# Rows fetched from the server-side cursor at a time
+FETCH_SIZE = 1000
+
+
+def exported_shapes():
+    """
+    (name, table, columns) of every shape table. Shapes that share a table,
+    like squares and rectangles, are exported as the first shape registered
+    on it, and without their discriminator.
+    """
+    return [(model.name, model.__table__,
+             [column for column in model.__table__.columns
+              if column.key != 'user_id' and column is not model.__mapper__.polymorphic_on])
+            for model in table_models()]
+
+
+def parse_since(value):
+    """
+    The naive UTC datetime, as stored in updated_at, of an ISO 8601 string
+    """
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    since = datetime.fromisoformat(value)
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return since
+
+
+def to_json(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(repr(value) + ' is not JSON serializable')
+
+
+def export_lines(user_id, since=None):
+    """
+    Every shape of a user as one JSON object per line, without the _links
+    that to_dict adds. All tables are read in one transaction with a
+    consistent snapshot, through server-side cursors, so memory use does
+    not depend on how many shapes there are.
+    """
+    dumps = json_provider().dumps
+    connection = db.engine.connect().execution_options(stream_results=True)
+    mysql = connection.dialect.name == 'mysql'
+    if mysql:
+        connection = connection.execution_options(
+            isolation_level='REPEATABLE READ')
+    try:
+        transaction = connection.begin()
+        if mysql:
+            # Take the snapshot now instead of at the first read
+            connection.execute(
+                text('START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY'))
+        for shape, table, columns in exported_shapes():
+            query = select(columns).where(table.c.user_id == user_id)
+            if since is not None:
+                query = query.where(table.c.updated_at >= since)
+            result = connection.execute(
+                query.order_by(*table.primary_key.columns))
+            while True:
+                rows = result.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                yield b''.join(dumps(dict(row, shape=shape), default=to_json) + b'\n'
+                               for row in rows)
+        transaction.commit()
+    finally:
+        connection.close()
@@ -0,0 +1,26 @@
+from flask import request
+
+
+def sparse_fieldset(available):
+    """
+    The `fields` and `links` arguments of a read request: a tuple of field
+    names out of `available` (None for all of them) and whether to build
+    _links. Returns the fields, links and an error message.
+    """
+    fields = None
+    if 'fields' in request.args:
+        fields = tuple(field for field in request.args['fields'].split(',') if field)
+        if not fields or any(field not in available for field in fields):
+            return None, None, 'fields must be some of ' + ', '.join(available)
+    links = request.args.get('links', 'true').lower()
+    if links not in ('true', 'false'):
+        return None, None, 'links must be true or false'
+    return fields, links == 'true', None
+
+
+def fieldset_args():
+    """
+    The fieldset arguments of the request, to carry over to page links
+    """
+    return {name: request.args[name] for name in ('fields', 'links')
+            if name in request.args}
@@ -0,0 +1,152 @@
+import gzip
+import itertools
+import re
+import secrets
+import numpy as np
+from flask import current_app, request, url_for
+from ..payloads import json_provider, respond
+from .. import db
+from ..models.import_checkpoint import ImportCheckpoint
+from . import api
+from .auth import token_auth
+from .batch import INSERT_CHUNK_SIZE
+from .compute import to_list
+from .errors import bad_request, error_response
+from .shapes import SHAPES, VALIDATORS
+from .users import check_owner
+
+IMPORT_ID = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+NOT_FINITE = 'dimensions must be finite numbers'
+
+
+def read_lines(stream, skip):
+    """
+    (line number, line) of every line after the first `skip` ones, read
+    from the stream as it arrives
+    """
+    for number, line in enumerate(stream, 1):
+        if number > skip:
+            yield number, line
+
+
+def finite(values):
+    # Integers too large for a float, which only the stdlib JSON decoder
+    # gives, overflow instead of becoming infinite
+    try:
+        return bool(np.isfinite(np.array(values, dtype=np.float64)).all())
+    except OverflowError:
+        return False
+
+
+def chunk_rows(chunk, user_id):
+    """
+    Parse and validate a chunk of lines, then compute the stored measures
+    of its shapes. Dimensions are checked with one NumPy comparison per
+    shape type; the single-create validation only runs to word the errors
+    of a type that failed it. Returns the rows to insert per table and the
+    errors.
+    """
+    groups = {}
+    errors = []
+    loads = json_provider().loads
+    for number, line in chunk:
+        if not line.strip():
+            continue
+        try:
+            data = loads(line)
+        except ValueError:
+            errors.append({'line': number, 'message': 'invalid JSON'})
+            continue
+        if not isinstance(data, dict):
+            errors.append({'line': number, 'message': 'must be an object'})
+        elif not isinstance(data.get('shape'), str) or data['shape'] not in SHAPES:
+            errors.append({'line': number, 'message': 'shape must be one of ' +
+                           ', '.join(SHAPES)})
+        else:
+            groups.setdefault(data['shape'], []).append((number, data))
+    rows = {}
+    for shape, lines in groups.items():
+        model, validate = SHAPES[shape], VALIDATORS[shape]
+        fields = model.dimensions
+        values = [[data.get(field) for field in fields] for _, data in lines]
+        valid = {type(value) for value in itertools.chain.from_iterable(values)} <= {int, float}
+        if valid:
+            try:
+                dimensions = np.array(values, dtype=np.float64)
+            except OverflowError:
+                valid = False
+            else:
+                valid = bool((np.isfinite(dimensions) & (dimensions > 0)).all())
+        if not valid:
+            for number, data in lines:
+                message = validate(data)
+                if not message and not finite([data[field] for field in fields]):
+                    message = NOT_FINITE
+                if message:
+                    errors.append({'line': number, 'message': message})
+            continue
+        with np.errstate(invalid='ignore'):
+            areas, perimeters = model.measure(*dimensions.T, sqrt=np.sqrt)
+        table_rows = rows.setdefault(model.__table__, [])
+        for row, area, perimeter in zip(dimensions.tolist(), to_list(areas), to_list(perimeters)):
+            row = model.columns(dict(zip(fields, row)))
+            row.update(model.discriminate(row), area=area, perimeter=perimeter,
+                       user_id=user_id)
+            table_rows.append(row)
+    return rows, sorted(errors, key=lambda error: error['line'])
+
+
+@api.route('/users/<int:user_id>/import', methods=['POST'])
+@token_auth.login_required
+def import_user_shapes(user_id):
+    check_owner(user_id)
+    import_id = request.args.get('import_id') or secrets.token_hex(16)
+    if not IMPORT_ID.match(import_id):
+        return bad_request('import_id must be 1 to 64 letters, digits, - or _')
+    checkpoint = ImportCheckpoint.query.get((user_id, import_id))
+    if checkpoint is None:
+        checkpoint = ImportCheckpoint(user_id=user_id, import_id=import_id)
+        db.session.add(checkpoint)
+        db.session.commit()
+    location = url_for('api.get_import', user_id=user_id, import_id=import_id)
+    stream = request.stream
+    if request.headers.get('Content-Encoding') == 'gzip':
+        stream = gzip.GzipFile(fileobj=stream, mode='rb')
+    # Lines up to the checkpoint were committed by an earlier attempt
+    lines = read_lines(stream, checkpoint.lines)
+    chunk_size = current_app.config['IMPORT_CHUNK_SIZE']
+    while not checkpoint.finished:
+        try:
+            chunk = list(itertools.islice(lines, chunk_size))
+        except (OSError, EOFError):
+            response = bad_request('invalid gzip stream')
+            response.headers['Location'] = location
+            return response
+        if not chunk:
+            checkpoint.finished = True
+            db.session.commit()
+            break
+        rows, errors = chunk_rows(chunk, user_id)
+        if errors:
+            response = error_response(
+                400, 'import contains invalid shapes', errors)
+            response.headers['Location'] = location
+            return response
+        for table, table_rows in rows.items():
+            for start in range(0, len(table_rows), INSERT_CHUNK_SIZE):
+                db.session.execute(table.insert().values(
+                    table_rows[start:start + INSERT_CHUNK_SIZE]))
+            checkpoint.created += len(table_rows)
+        checkpoint.lines = chunk[-1][0]
+        db.session.commit()
+    response = respond(checkpoint.to_dict())
+    response.headers['Location'] = location
+    return response
+
+
+@api.route('/users/<int:user_id>/imports/<string:import_id>', methods=['GET'])
+@token_auth.login_required
+def get_import(user_id, import_id):
+    check_owner(user_id)
+    return respond(ImportCheckpoint.query.get_or_404((user_id, import_id)).to_dict())
@@ -0,0 +1,81 @@
+from flask import url_for
+from sqlalchemy import func, or_
+from ..jobs import JobKind, register_kind, start_job
+from ..payloads import respond
+from .. import db
+from ..models.job import Job
+from . import api
+from .auth import token_auth
+from .bulk import assignments
+from .shapes import table_models
+from .updates import differs
+from .users import check_owner
+
+
+class RecomputeMeasures(JobKind):
+    """
+    Recompute the stored area, perimeter and discriminator of every shape
+    of a user from its dimensions, table by table in primary key order.
+    The cursor is the index of the table and the last key done. Only rows
+    whose stored values are stale are written, and their version is kept,
+    as what a client sees of the shape has not changed.
+    """
+
+    name = 'recompute_measures'
+
+    def total(self, job, params):
+        return sum(db.session.query(func.count(model.key())).filter(
+            model.user_id == job.user_id).scalar() for model in table_models())
+
+    def step(self, job, params, cursor, limit):
+        models = table_models()
+        table, last = cursor or (0, None)
+        model = models[table]
+        key = model.key()
+        query = model.query.filter(model.user_id == job.user_id)
+        if last is not None:
+            query = query.filter(key > last)
+        # The key `limit` rows on bounds this chunk
+        upper = query.with_entities(key).order_by(key).offset(
+            limit - 1).limit(1).scalar()
+        if upper is not None:
+            query = query.filter(key <= upper)
+        values = [(column, value) for column, value in assignments(model, {})
+                  if column is not model.version]
+        done = query.count()
+        query.filter(or_(*[differs(column, value) for column, value in values])) \
+            .update(values, synchronize_session=False,
+                    update_args={'preserve_parameter_order': True})
+        if upper is not None:
+            return (table, upper), done
+        if table + 1 < len(models):
+            return (table + 1, None), done
+        return None, done
+
+
+register_kind(RecomputeMeasures())
+
+
+def accepted(job):
+    """
+    202 Accepted for a job, with where to poll its progress
+    """
+    response = respond(job.to_dict())
+    response.status_code = 202
+    response.headers['Location'] = url_for('api.get_job', job_id=job.job_id)
+    return response
+
+
+@api.route('/jobs/<string:job_id>', methods=['GET'])
+@token_auth.login_required
+def get_job(job_id):
+    job = Job.query.filter_by(
+        job_id=job_id, user_id=token_auth.current_user().user_id).first_or_404()
+    return respond(job.to_dict())
+
+
+@api.route('/users/<int:user_id>/recompute', methods=['POST'])
+@token_auth.login_required
+def recompute_user_shapes(user_id):
+    check_owner(user_id)
+    return accepted(start_job(RecomputeMeasures.name, user_id))
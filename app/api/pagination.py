@@ -0,0 +1,124 @@
+import base64
+import binascii
+import json
+import operator
+from flask import current_app, request, url_for
+from ..payloads import respond
+from sqlalchemy import and_, or_
+from .errors import bad_request
+
+
+def encode_cursor(*last_keys):
+    return base64.urlsafe_b64encode(
+        json.dumps(list(last_keys)).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size=1):
+    """
+    The keys held by a cursor. All but the last may be any number; the last
+    one is always a primary key.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(
+            cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise ValueError('invalid cursor')
+    if not isinstance(data, list) or len(data) != size or type(data[-1]) != int:
+        raise ValueError('invalid cursor')
+    if any(type(value) != int and type(value) != float for value in data[:-1]):
+        raise ValueError('invalid cursor')
+    return data
+
+
+def after(keys, values):
+    """
+    (key1, key2, ...) > (value1, value2, ...), spelled out with AND and OR
+    so that MySQL can use an index on the keys for it
+    """
+    condition = keys[-1] > values[-1]
+    for key, value in zip(reversed(keys[:-1]), reversed(values[:-1])):
+        condition = or_(key > value, and_(key == value, condition))
+    return condition
+
+
+def page_args(size=1):
+    """
+    The page size the request asks for, its `cursor` and the `size` keys
+    that cursor holds, None on the first page. Returns them and an error
+    message, if the arguments are invalid.
+    """
+    limit = request.args.get(
+        'limit', current_app.config['PAGE_SIZE'], type=int)
+    if limit is None or limit <= 0:
+        return None, None, None, 'limit must be a positive integer'
+    limit = min(limit, current_app.config['MAX_PAGE_SIZE'])
+    cursor = request.args.get('cursor')
+    last = None
+    if cursor:
+        try:
+            last = decode_cursor(cursor, size)
+        except ValueError:
+            return None, None, None, 'invalid cursor'
+    return limit, cursor, last, None
+
+
+def paginate(query, key, endpoint, serialize=lambda item: item.to_dict(), **values):
+    """
+    Respond with one page of `query`, ordered by the primary key column
+    `key`, or by a tuple of columns ending with the primary key. Pages are
+    keyset based: the opaque `cursor` argument holds the last keys of the
+    previous page, so every page costs the same index range scan however
+    deep the client is. `values` are passed on to url_for for the links.
+    """
+    keys = key if isinstance(key, tuple) else (key,)
+    limit, cursor, last, error = page_args(len(keys))
+    if error:
+        return bad_request(error)
+    if last is not None:
+        query = query.filter(after(keys, last))
+    items = query.order_by(*keys).limit(limit + 1).all()
+    return page_response(items, keys, limit, cursor, endpoint, serialize, **values)
+
+
+def page_response(items, keys, limit, cursor, endpoint, serialize, **values):
+    """
+    Respond with up to `limit` of `items`, fetched one more than that so
+    that a next page is known to exist, and the cursor after the last one
+    """
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(
+            *[getattr(items[-1], column.key) for column in keys])
+    return respond({
+        'items': [serialize(item) for item in items],
+        'next': next_cursor,
+        '_links': {
+            'self': url_for(endpoint, limit=limit, cursor=cursor, **values),
+            'next': url_for(endpoint, limit=limit, cursor=next_cursor, **values) if next_cursor else None
+        }
+    })
+
+
+def paginate_range(model, query, key, endpoint, serialize=lambda item: item.to_dict(), **values):
+    """
+    Respond with one page of the shapes of `query`, the current user's,
+    whose area (or perimeter, with by=perimeter) lies between the optional
+    `min` and `max` arguments, ordered by that measure. The
+    (user_id, area) and (user_id, perimeter) indexes serve both the filter
+    and the order. `query` must select the area and perimeter.
+    """
+    by = request.args.get('by', 'area')
+    if by not in ('area', 'perimeter'):
+        return bad_request('by must be area or perimeter')
+    measure = getattr(model, by)
+    query = query.filter(measure.isnot(None))
+    bounds = {}
+    for name, compare in (('min', operator.ge), ('max', operator.le)):
+        if name in request.args:
+            bounds[name] = request.args.get(name, type=float)
+            if bounds[name] is None:
+                return bad_request(name + ' must be a number')
+            query = query.filter(compare(measure, bounds[name]))
+    return paginate(query, (measure, key), endpoint, serialize,
+                    by=by, **bounds, **values)
@@ -0,0 +1,261 @@
+from collections import OrderedDict
+from types import SimpleNamespace
+from flask import request, url_for
+from sqlalchemy import false, literal, null, select, union_all
+from ..payloads import get_payload, respond
+from .. import db
+from ..models.diamond import Diamond
+from ..models.rectangle import Rectangle
+from ..models.square import Square
+from ..models.triangle import Triangle
+from . import api
+from .auth import token_auth
+from .batch import create_batch
+from .bulk import assignments, bulk_delete, bulk_update
+from .conditional import conditional_get, if_match_versions, make_etag
+from .errors import bad_request
+from .fields import fieldset_args, sparse_fieldset
+from .pagination import page_args, page_response, paginate, paginate_range
+from .updates import update_one
+
+NUMBER_TYPES = frozenset((int, float))
+
+# Every shape the API serves and the validator of new ones, by name
+SHAPES = OrderedDict()
+VALIDATORS = {}
+
+
+def compile_validator(model, partial=False):
+    """
+    Build the validator of a shape once. It returns the first error of the
+    dimensions in `data`, or None. A `partial` validator, for updates, lets
+    dimensions be missing.
+    """
+    fields = model.dimensions
+    missing, not_number, not_positive = model.messages
+
+    def validate(data):
+        try:
+            if partial:
+                values = [data[field] for field in fields if field in data]
+            else:
+                values = [data[field] for field in fields]
+        except (KeyError, TypeError):
+            return missing
+        if not NUMBER_TYPES.issuperset(map(type, values)):
+            return not_number
+        if not all(value > 0 for value in values):
+            return not_positive
+
+    return validate
+
+
+def register(model):
+    """
+    Add the routes of a shape to the api blueprint, under the endpoint names
+    its serializer links to
+    """
+    name, plural, key = model.name, model.plural, model.key()
+    validate_new = compile_validator(model)
+    validate_update = compile_validator(model, partial=True)
+    SHAPES[name] = model
+    VALIDATORS[name] = validate_new
+
+    available = tuple(model.field_attributes())
+
+    def owned():
+        return model.owned_by(token_auth.current_user().user_id)
+
+    def get_shapes():
+        fields, links, error = sparse_fieldset(available)
+        if error:
+            return bad_request(error)
+        query = owned().with_entities(*model.load_columns(fields, links))
+        return paginate(query, key, 'api.get_' + plural,
+                        model.serializer(fields, links), **fieldset_args())
+
+    def get_shapes_in_range():
+        fields, links, error = sparse_fieldset(available)
+        if error:
+            return bad_request(error)
+        query = owned().with_entities(*model.load_columns(fields, links),
+                                      model.area, model.perimeter)
+        return paginate_range(model, query, key, 'api.get_{}_in_range'.format(plural),
+                              model.serializer(fields, links), **fieldset_args())
+
+    tag_columns = (key, model.version)
+
+    def get_shape(**ids):
+        fields, links, error = sparse_fieldset(available)
+        if error:
+            return bad_request(error)
+        query = owned().filter(key == ids[key.key]).with_entities(
+            *model.load_columns(fields, links))
+        return conditional_get(query, tag_columns,
+                               model.serializer(fields, links), fields, links)
+
+    def measure_getter(column, label):
+        def get_measure(**ids):
+            # Only the stored measure, not the whole row
+            query = owned().filter(key == ids[key.key]).with_entities(
+                column, *tag_columns)
+            return conditional_get(query, tag_columns,
+                                   lambda row: {label: row[0]})
+        return get_measure
+
+    def create_shape():
+        data = get_payload() or {}
+        error = validate_new(data)
+        if error:
+            return bad_request(error)
+        shape = model()
+        shape.from_dict(data, token_auth.current_user().user_id)
+        db.session.add(shape)
+        # The INSERT gives back the key, and the commit leaves the shape's
+        # values in place (expire_on_commit), so it is not selected
+        db.session.commit()
+        response = respond(shape.to_dict())
+        response.status_code = 201
+        response.set_etag(make_etag(
+            (getattr(shape, key.key), shape.version)))
+        response.headers['Location'] = [url_for(
+            'api.get_' + name, **{key.key: getattr(shape, key.key)})]
+        return response
+
+    def create_shapes():
+        return create_batch(model, validate_new)
+
+    def update_shape(**ids):
+        data = get_payload() or {}
+        error = validate_update(data)
+        if error:
+            return bad_request(error)
+        # One UPDATE, without loading the shape first. A row of a shared
+        # table, say a square, is updated and shown as the shape of the route.
+        changes = {field: data[field] for field in model.dimensions
+                   if field in data and data[field]}
+        compared = [(getattr(model, column), value)
+                    for column, value in model.columns(changes).items()]
+        row, failed = update_one(model, owned().filter(key == ids[key.key]),
+                                 assignments(model, changes), compared,
+                                 model.load_columns(),
+                                 if_match_versions((ids[key.key],)))
+        if failed:
+            return failed
+        db.session.commit()
+        response = respond(model.serializer()(row))
+        response.set_etag(make_etag((ids[key.key], row.version)))
+        return response
+
+    def del_shape(**ids):
+        db.session.delete(owned().filter(
+            key == ids[key.key]).first_or_404())
+        db.session.commit()
+        return '', 204
+
+    def update_shapes():
+        return bulk_update(model)
+
+    def del_shapes():
+        return bulk_delete(model)
+
+    item = '/{}/<int:{}>'.format(plural, key.key)
+    routes = [
+        ('/' + plural, 'GET', 'get_' + plural, get_shapes),
+        ('/{}/range'.format(plural), 'GET', 'get_{}_in_range'.format(plural), get_shapes_in_range),
+        (item, 'GET', 'get_' + name, get_shape),
+        (item + '/area', 'GET', 'get_{}_area'.format(name), measure_getter(model.area, 'Area')),
+        (item + '/perimeter', 'GET', 'get_{}_perimeter'.format(name), measure_getter(model.perimeter, 'Perimeter')),
+        ('/' + plural, 'POST', 'create_' + name, create_shape),
+        ('/{}/batch'.format(plural), 'POST', 'create_' + plural, create_shapes),
+        (item, 'PUT', 'update_' + name, update_shape),
+        (item, 'DELETE', 'del_' + name, del_shape),
+        ('/' + plural, 'PATCH', 'update_' + plural, update_shapes),
+        ('/' + plural, 'DELETE', 'del_' + plural, del_shapes)
+    ]
+    for rule, method, endpoint, view in routes:
+        api.add_url_rule(rule, endpoint, token_auth.login_required(view),
+                         methods=[method])
+
+
+def table_models():
+    """
+    The first shape registered on each table, as which any row of the table
+    can be read
+    """
+    tables = OrderedDict()
+    for model in SHAPES.values():
+        tables.setdefault(model.__table__, model)
+    return list(tables.values())
+
+
+def all_shapes(user_id, last=None, limit=None):
+    """
+    Every shape of a user, from all tables in one UNION ALL, with the
+    dimensions of each table in the same numbered columns. `table` numbers
+    the tables, so (table, id) identifies a shape.
+
+    With the (table, id) of the `last` shape of a page and a `limit`, each
+    table only gives its first `limit` shapes after that one, in key order,
+    so that a page reads at most `limit` rows of each table's
+    (user_id, key) index however many shapes the user has.
+    """
+    models = table_models()
+    size = max(len(model.dimensions) for model in models)
+    selects = []
+    for number, model in enumerate(models):
+        discriminator = model.__mapper__.polymorphic_on
+        key = model.key()
+        dimensions = [getattr(model, field) for field in model.dimensions]
+        dimensions += [null()] * (size - len(dimensions))
+        query = select(
+            [literal(number).label('table'), key.label('id'),
+             (literal(model.name) if discriminator is None else discriminator).label('shape'),
+             model.user_id.label('user_id')]
+            + [dimension.label('dimension{}'.format(i)) for i, dimension in enumerate(dimensions)]
+        ).where(model.user_id == user_id)
+        if last is not None:
+            # Tables before the last shape's are done, and its own carries
+            # on after it
+            if number < last[0]:
+                query = query.where(false())
+            elif number == last[0]:
+                query = query.where(key > last[1])
+        if limit is not None:
+            # A derived table, as a branch of a UNION cannot be limited
+            # on every database
+            query = select([query.order_by(key).limit(limit).alias()])
+        selects.append(query)
+    return union_all(*selects).alias('shapes')
+
+
+@api.route('/shapes', methods=['GET'])
+@token_auth.login_required
+def get_shapes():
+    if 'fields' in request.args:
+        return bad_request('fields can only be chosen per shape type')
+    _, links, error = sparse_fieldset(())
+    if error:
+        return bad_request(error)
+    limit, cursor, last, error = page_args(2)
+    if error:
+        return bad_request(error)
+    models = table_models()
+    shapes = all_shapes(token_auth.current_user().user_id, last, limit + 1)
+
+    def serialize(row):
+        # Read the row as its table's first shape, then show it as its own
+        table = models[row.table]
+        item = SimpleNamespace(user_id=row.user_id, **{table.key().key: row.id})
+        for i, field in enumerate(table.dimensions):
+            setattr(item, field, getattr(row, 'dimension{}'.format(i)))
+        return dict(SHAPES[row.shape].serializer(links=links)(item), shape=row.shape)
+
+    keys = (shapes.c.table, shapes.c.id)
+    items = db.session.query(shapes).order_by(*keys).limit(limit + 1).all()
+    return page_response(items, keys, limit, cursor, 'api.get_shapes',
+                         serialize, **fieldset_args())
+
+
+for shape in (Rectangle, Square, Triangle, Diamond):
+    register(shape)
@@ -0,0 +1,64 @@
+from sqlalchemy import case, func
+from .. import db
+from ..models.diamond import Diamond
+from ..models.rectangle import Rectangle
+from ..models.triangle import Triangle
+
+AGGREGATES = (('sum', func.sum), ('min', func.min),
+              ('max', func.max), ('mean', func.avg))
+
+
+def aggregate_columns(area, perimeter, when=None):
+    """
+    COUNT plus SUM/MIN/MAX/AVG of the area and perimeter expressions,
+    optionally only over the rows matching `when`. Every row is counted,
+    including a triangle whose sides make no area, which the area
+    aggregates skip as NULL.
+    """
+    def only(expression):
+        return expression if when is None else case([(when, expression)])
+
+    columns = [func.count() if when is None else func.count(only(1))]
+    for expression in (area, perimeter):
+        columns += [aggregate(only(expression))
+                    for _, aggregate in AGGREGATES]
+    return columns
+
+
+def to_stats(row):
+    stats = {'count': row[0]}
+    for offset, measure in ((1, 'area'), (1 + len(AGGREGATES), 'perimeter')):
+        stats[measure] = {
+            name: None if value is None else float(value)
+            for (name, _), value in zip(AGGREGATES, row[offset:offset + len(AGGREGATES)])
+        }
+    return stats
+
+
+def user_shape_stats(user_id):
+    """
+    Aggregate statistics of a user's shapes, computed by the database from
+    the stored measures with one query per table. Squares are the rectangles
+    whose sides are equal, so they are counted among the rectangles too.
+    """
+    rectangles = db.session.query(
+        *aggregate_columns(Rectangle.area, Rectangle.perimeter),
+        *aggregate_columns(Rectangle.area, Rectangle.perimeter,
+                           when=Rectangle.length == Rectangle.width)
+    ).filter(Rectangle.user_id == user_id).one()
+    split = 1 + 2 * len(AGGREGATES)
+
+    triangles = db.session.query(*aggregate_columns(
+        Triangle.area, Triangle.perimeter
+    )).filter(Triangle.user_id == user_id).one()
+
+    diamonds = db.session.query(*aggregate_columns(
+        Diamond.area, Diamond.perimeter
+    )).filter(Diamond.user_id == user_id).one()
+
+    return {
+        'rectangles': to_stats(rectangles[:split]),
+        'squares': to_stats(rectangles[split:]),
+        'triangles': to_stats(triangles),
+        'diamonds': to_stats(diamonds)
+    }
@@ -1,5 +1,9 @@
-from flask import jsonify
+from flask import abort, current_app
+from ..payloads import respond
 from .. import db
+from ..auth.cache import invalidate_token, token_cache
+from ..auth.signed import signed_tokens
+from ..models.user import User
 from . import api
 from .auth import basic_auth, token_auth
 
@@ -7,14 +11,34 @@ from .auth import basic_auth, token_auth
 @api.route('/login', methods=['GET'])
 @basic_auth.login_required
 def get_token():
-    token = basic_auth.current_user().get_token()
+    user = basic_auth.current_user()
+    if current_app.config['TOKEN_MODE'] == 'signed':
+        return respond({'token': signed_tokens().issue(user.user_id)})
+    old_token = user.token
+    token = user.get_token(expires_in=current_app.config['TOKEN_EXPIRES_IN'])
     db.session.commit()
-    return jsonify({'token': token})
+    # Only once committed, or a concurrent request could cache the old
+    # token again from the row as it was
+    if token != old_token:
+        invalidate_token(old_token)
+    return respond({'token': token})
 
 
 @api.route('/logout', methods=['DELETE'])
 @token_auth.login_required
 def revoke_token():
-    token_auth.current_user().revoke_token()
+    if signed_tokens().revoke(token_auth.get_auth()['token']):
+        return '', 204
+    user = User.query.get(token_auth.current_user().user_id)
+    user.revoke_token()
     db.session.commit()
+    invalidate_token(user.token)
     return '', 204
+
+
+@api.route('/tokens/cache', methods=['GET'])
+@token_auth.login_required
+def get_token_cache_stats():
+    if not current_app.config['TOKEN_CACHE_STATS']:
+        abort(404)
+    return respond(token_cache().stats())
@@ -0,0 +1,49 @@
+from sqlalchemy import and_, or_, update
+from .. import db
+from .conditional import resource_modified
+
+
+def supports_returning(dialect):
+    # Only known once the dialect has connected, which authentication has
+    # done by the time anything is updated
+    return getattr(dialect, 'update_returning', dialect.implicit_returning)
+
+
+def differs(column, value):
+    # NULL is different from any value, but NULL != value is not true
+    return or_(column != value, column.is_(None))
+
+
+def update_one(model, query, values, compared, columns, versions=None):
+    """
+    Give the row of `query` the (column, value) pairs in `values` with a
+    single UPDATE, unless the (column, value) pairs in `compared` are
+    already stored, and return the row's `columns` as it then is.
+    Databases with UPDATE ... RETURNING give the row back from the same
+    statement; others, such as MySQL, select it afterwards in the same
+    transaction.
+
+    `versions` are the versions an If-Match header names, if it is there.
+    Responds 404 without a row. Returns the row and an error response, a 412
+    when the row has another version.
+    """
+    version = model.version
+    row = None
+    if compared and versions != set():
+        where = [query.whereclause,
+                 or_(*[differs(column, value) for column, value in compared])]
+        if versions is not None:
+            where.append(version.in_(versions))
+        statement = update(model.__table__, preserve_parameter_order=True) \
+            .where(and_(*where)).values(values)
+        if supports_returning(db.session.get_bind().dialect):
+            row = db.session.execute(statement.returning(*columns)).first()
+        elif db.session.execute(statement).rowcount:
+            row = query.with_entities(*columns).first()
+    if row is None:
+        # Nothing was written: the row is missing, is of another version, or
+        # already holds the values
+        row = query.with_entities(*columns).first_or_404()
+        if versions is not None and row.version not in versions:
+            return None, resource_modified()
+    return row, None
@@ -1,32 +1,80 @@
 from . import api
-from flask import jsonify, request, url_for, abort
+from flask import Response, request, stream_with_context, url_for, abort
+from ..payloads import get_payload, respond
 from validate_email import validate_email
 import safe
 from ..models.user import User
 from .errors import bad_request
 from .. import db
+from ..auth.cache import invalidate_user
+from ..auth.signed import revoke_user_tokens
 from .auth import token_auth
+from .fields import sparse_fieldset
+from .conditional import conditional_get, if_match_versions, make_etag
+from .export import export_lines, parse_since
+from .stats import user_shape_stats
+from .updates import update_one
+
+
+def check_owner(user_id):
+    """
+    Only let users act on their own account
+    """
+    if token_auth.current_user().user_id != user_id:
+        abort(403)
 
 
 @api.route('/users/<string:user_name>', methods=['GET'])
 @token_auth.login_required
 def get_user_by_user_name(user_name):
-    if token_auth.current_user().user_name != user_name:
-        abort(403)
-    return jsonify(User.query.filter_by(user_name=user_name).one().to_dict())
+    user = db.session.query(User.user_id).filter_by(
+        user_name=user_name).first()
+    check_owner(user.user_id if user else None)
+    return get_user(user.user_id)
 
 
 @api.route('/users/<int:user_id>', methods=['GET'])
 @token_auth.login_required
 def get_user_by_user_id(user_id):
-    if token_auth.current_user().user_id != user_id:
-        abort(403)
-    return jsonify(User.query.get_or_404(user_id).to_dict())
+    check_owner(user_id)
+    return get_user(user_id)
+
+
+def get_user(user_id):
+    fields, links, error = sparse_fieldset(User.FIELDS)
+    if error:
+        return bad_request(error)
+    query = User.query.filter_by(user_id=user_id).with_entities(
+        *User.load_columns(fields, links))
+    return conditional_get(query, (User.user_id, User.version),
+                           User.serializer(fields, links), fields, links)
+
+
+@api.route('/users/<int:user_id>/stats', methods=['GET'])
+@token_auth.login_required
+def get_user_stats(user_id):
+    check_owner(user_id)
+    return respond(user_shape_stats(user_id))
+
+
+@api.route('/users/<int:user_id>/export', methods=['GET'])
+@token_auth.login_required
+def export_user_shapes(user_id):
+    check_owner(user_id)
+    since = None
+    if request.args.get('since'):
+        try:
+            since = parse_since(request.args['since'])
+        except ValueError:
+            return bad_request('since must be an ISO 8601 date and time')
+    # Compressed as it streams when the client accepts it
+    return Response(stream_with_context(export_lines(user_id, since)),
+                    mimetype='application/x-ndjson')
 
 
 @api.route('/users/register', methods=['POST'])
 def create_user():
-    data = request.get_json() or {}
+    data = get_payload() or {}
     if 'user_name' not in data or 'password' not in data:
         return bad_request('must include user_name and password fields')
     if User.query.filter_by(user_name=data['user_name']).first():
@@ -45,7 +93,7 @@ def create_user():
     user.from_dict(data, new_user=True)
     db.session.add(user)
     db.session.commit()
-    response = jsonify(user.to_dict())
+    response = respond(user.to_dict())
     response.status_code = 201
     response.headers['Location'] = url_for(
         'api.get_user_by_user_id', user_id=user.user_id)
@@ -55,50 +103,72 @@ def create_user():
 @api.route('/users/<int:user_id>', methods=['PUT'])
 @token_auth.login_required
 def update_user_by_user_id(user_id):
-    if token_auth.current_user().user_id != user_id:
-        abort(403)
-    user = User.query.get_or_404(user_id)
-    data = request.get_json() or {}
-    return update_user_helper(user, data)
+    check_owner(user_id)
+    data = get_payload() or {}
+    return update_user_helper(user_id, data)
 
 
 @api.route('/users/<string:user_name>', methods=['PUT'])
 @token_auth.login_required
 def update_user_by_user_name(user_name):
-    if token_auth.current_user().user_name != user_name:
-        abort(403)
-    user = User.query.filter_by(user_name=user_name).one()
-    data = request.get_json() or {}
-    return update_user_helper(user, data)
+    user = db.session.query(User.user_id).filter_by(
+        user_name=user_name).first()
+    check_owner(user.user_id if user else None)
+    data = get_payload() or {}
+    return update_user_helper(user.user_id, data)
 
 
-def update_user_helper(user, data):
-    if 'user_name' in data and data['user_name'] != user.user_name and User.query.filter_by(user_name=data['user_name']).first():
+def taken(column, value, user_id):
+    return db.session.query(User.user_id).filter(
+        column == value, User.user_id != user_id).first() is not None
+
+
+def update_user_helper(user_id, data):
+    if 'user_name' in data and taken(User.user_name, data['user_name'], user_id):
         return bad_request('please use a different username')
-    if 'email' in data and data['email'] != user.email and User.query.filter_by(email=data['email']).first():
+    if 'email' in data and taken(User.email, data['email'], user_id):
         return bad_request('please use a different email address')
     if 'password' in data and not safe.check(data['password']).valid:
         return bad_request('please enter a stronger password')
-    user.from_dict(data, new_user=False)
+    # One UPDATE, without loading the user first, that bumps the version
+    # only if the profile changes
+    compared = [(getattr(User, field), data[field])
+                for field in ['user_name', 'email', 'first_name', 'last_name']
+                if field in data and data[field]]
+    row, failed = update_one(User, User.query.filter_by(user_id=user_id),
+                             [(User.version, User.version + 1)] + compared,
+                             compared, User.load_columns(),
+                             if_match_versions((user_id,)))
+    if failed:
+        return failed
     db.session.commit()
-    return jsonify(user.to_dict())
+    response = respond(User.serializer()(row))
+    response.set_etag(make_etag((row.user_id, row.version)))
+    return response
 
 
 @api.route('/users/<string:user_name>', methods=['DELETE'])
 @token_auth.login_required
 def del_user_by_user_name(user_name):
-    if token_auth.current_user().user_name != user_name:
-        abort(403)
-    db.session.delete(User.query.filter_by(user_name=user_name).one())
-    db.session.commit()
-    return '', 204
+    user = db.session.query(User.user_id).filter_by(
+        user_name=user_name).first()
+    check_owner(user.user_id if user else None)
+    return delete_user(user.user_id)
 
 
 @api.route('/users/<int:user_id>', methods=['DELETE'])
 @token_auth.login_required
 def del_user_by_user_id(user_id):
-    if token_auth.current_user().user_id != user_id:
-        abort(403)
-    db.session.delete(User.query.get_or_404(user_id))
+    check_owner(user_id)
+    return delete_user(user_id)
+
+
+def delete_user(user_id):
+    # One DELETE, however many shapes the user has: the database deletes
+    # them through the foreign keys
+    if not User.query.filter_by(user_id=user_id).delete(synchronize_session=False):
+        abort(404)
     db.session.commit()
+    invalidate_user(user_id)
+    revoke_user_tokens(user_id)
     return '', 204
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+from flask import current_app, has_app_context
+
+# What a verified bearer token resolves to. Handlers only ever need the id of
+# the authenticated user, so that is all we keep in memory.
+Principal = namedtuple('Principal', ['user_id'])
+
+
+class TokenCache(object):
+    """
+    Bounded, thread-safe LRU cache mapping bearer tokens to principals.
+
+    Entries live for at most `ttl` seconds and never outlive the token itself.
+    """
+
+    def __init__(self, max_size=10000, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._tokens_by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, token):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal, deadline = entry
+            if deadline <= now:
+                self._discard(token)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return principal
+
+    def set(self, token, principal, expires_at=None):
+        """
+        Cache a principal. `expires_at` is the token's own (UTC) expiration.
+        """
+        ttl = self.ttl
+        if expires_at is not None:
+            ttl = min(ttl, (expires_at - datetime.utcnow()).total_seconds())
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._discard(token)
+            self._entries[token] = (principal, time.monotonic() + ttl)
+            self._tokens_by_user.setdefault(
+                principal.user_id, set()).add(token)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def invalidate(self, token):
+        with self._lock:
+            if self._discard(token):
+                self.invalidations += 1
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._discard(token)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+    def _discard(self, token):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return False
+        tokens = self._tokens_by_user.get(entry[0].user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry[0].user_id]
+        return True
+
+
+def init_app(app):
+    app.extensions['token_cache'] = TokenCache(
+        max_size=app.config['TOKEN_CACHE_SIZE'],
+        ttl=app.config['TOKEN_CACHE_TTL'])
+
+
+def token_cache():
+    return current_app.extensions['token_cache']
+
+
+def invalidate_token(token):
+    """
+    Drop a token from the current app's cache, if there is one
+    """
+    if token and has_app_context() and 'token_cache' in current_app.extensions:
+        token_cache().invalidate(token)
+
+
+def invalidate_user(user_id):
+    """
+    Drop every cached token belonging to a user
+    """
+    if has_app_context() and 'token_cache' in current_app.extensions:
+        token_cache().invalidate_user(user_id)
@@ -0,0 +1,146 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from flask import current_app, has_app_context
+from werkzeug.security import (DEFAULT_PBKDF2_ITERATIONS, check_password_hash,
+                               generate_password_hash)
+
+BACKENDS = ('inline', 'thread', 'process')
+
+_lock = threading.Lock()
+
+
+class HasherBusy(Exception):
+    """
+    Raised when the hashing pool already has as many jobs as it may queue
+    """
+
+
+class PasswordHasher(object):
+    """
+    Runs password hashing and verification either on the calling thread
+    ('inline') or on a bounded thread or process pool, so that a burst of
+    logins cannot take every CPU away from the rest of the API
+    """
+
+    def __init__(self, backend='inline', max_workers=None, max_queue=64,
+                 method='pbkdf2:sha256', iterations=None, salt_length=8):
+        if backend not in BACKENDS:
+            raise ValueError('unknown password hash backend: ' + backend)
+        self.backend = backend
+        self.max_queue = max_queue
+        self.method = hash_method(method, iterations)
+        self.salt_length = salt_length
+        self._executor = None
+        if backend == 'thread':
+            self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        elif backend == 'process':
+            self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        self._slots = threading.BoundedSemaphore(max_queue)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(backend=config['PASSWORD_HASH_BACKEND'],
+                   max_workers=config['PASSWORD_HASH_WORKERS'],
+                   max_queue=config['PASSWORD_HASH_MAX_QUEUE'],
+                   method=config['PASSWORD_HASH_METHOD'],
+                   iterations=config['PASSWORD_HASH_ITERATIONS'],
+                   salt_length=config['PASSWORD_SALT_LENGTH'])
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method,
+                         self.salt_length)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """
+        Check if a stored hash was made with other parameters than ours
+        """
+        method, _, rest = password_hash.partition('$')
+        salt = rest.partition('$')[0]
+        return method != self.method or len(salt) != self.salt_length
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def _run(self, func, *args):
+        if self._executor is None:
+            return func(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            return self._executor.submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+
+def hash_method(method, iterations=None):
+    """
+    The werkzeug method string for a method and PBKDF2 iteration count
+    """
+    if method.startswith('pbkdf2:'):
+        method = ':'.join(method.split(':')[:2])
+        if iterations is None:
+            # werkzeug spells out its own default in the hashes it makes
+            iterations = DEFAULT_PBKDF2_ITERATIONS
+        return '{}:{}'.format(method, iterations)
+    return method
+
+
+def calibrate(target_seconds, method='pbkdf2:sha256', samples=5,
+              probe_iterations=20000):
+    """
+    Time PBKDF2 on this host and return the largest iteration count (in
+    steps of 1000) whose hash takes no longer than `target_seconds`
+    """
+    def measure(iterations):
+        timings = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            generate_password_hash('calibration', hash_method(method, iterations))
+            timings.append(time.perf_counter() - started)
+        return sorted(timings)[len(timings) // 2]
+
+    per_iteration = measure(probe_iterations) / probe_iterations
+    iterations = max(1000, int(target_seconds / per_iteration) // 1000 * 1000)
+    return {
+        'method': hash_method(method, iterations),
+        'iterations': iterations,
+        'seconds': measure(iterations)
+    }
+
+
+def password_hasher():
+    """
+    The current app's hasher, created on first use so that configuration
+    changes made after create_app still apply
+    """
+    hasher = current_app.extensions.get('password_hasher')
+    if hasher is None:
+        with _lock:
+            hasher = current_app.extensions.get('password_hasher')
+            if hasher is None:
+                hasher = PasswordHasher.from_config(current_app.config)
+                current_app.extensions['password_hasher'] = hasher
+    return hasher
+
+
+def hash_password(password):
+    if not has_app_context():
+        return generate_password_hash(password)
+    return password_hasher().hash(password)
+
+
+def password_needs_rehash(password_hash):
+    if not has_app_context():
+        return False
+    return password_hasher().needs_rehash(password_hash)
+
+
+def verify_password(password_hash, password):
+    if not has_app_context():
+        return check_password_hash(password_hash, password)
+    return password_hasher().verify(password_hash, password)
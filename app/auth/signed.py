@@ -0,0 +1,131 @@
+import hashlib
+import threading
+import time
+from flask import current_app, has_app_context
+from itsdangerous import BadSignature, URLSafeSerializer
+from .cache import Principal
+
+
+class TokenDenylist(object):
+    """
+    Revoked signed tokens. Entries are only kept until the tokens they
+    refer to would have expired anyway, so the list stays small.
+    """
+
+    def __init__(self):
+        self._tokens = {}
+        self._users = {}
+        self._lock = threading.Lock()
+        self._next_purge = 0
+
+    def revoke(self, token, expires_at):
+        with self._lock:
+            self._tokens[self._digest(token)] = expires_at
+            self._purge()
+
+    def revoke_user(self, user_id, revoked_at, expires_at):
+        """
+        Reject every token issued to a user up to `revoked_at`
+        """
+        with self._lock:
+            self._users[user_id] = (revoked_at, expires_at)
+            self._purge()
+
+    def is_revoked(self, token, user_id, issued_at):
+        if not self._tokens and not self._users:
+            return False
+        with self._lock:
+            self._purge()
+            if self._digest(token) in self._tokens:
+                return True
+            revoked = self._users.get(user_id)
+            return revoked is not None and issued_at <= revoked[0]
+
+    def __len__(self):
+        return len(self._tokens) + len(self._users)
+
+    def _purge(self):
+        now = time.time()
+        if now < self._next_purge:
+            return
+        self._tokens = {digest: expires_at for digest, expires_at
+                        in self._tokens.items() if expires_at > now}
+        self._users = {user_id: revoked for user_id, revoked
+                       in self._users.items() if revoked[1] > now}
+        self._next_purge = now + 1
+
+    @staticmethod
+    def _digest(token):
+        return hashlib.sha256(token.encode('utf-8')).digest()[:16]
+
+
+class SignedTokens(object):
+    """
+    Issues and verifies self-describing access tokens, HMAC-SHA256 signed
+    with the app's SECRET_KEY, so that verifying them needs no database I/O
+    """
+
+    def __init__(self, secret_key, expires_in=3600):
+        self.expires_in = expires_in
+        self.denylist = TokenDenylist()
+        self._serializer = URLSafeSerializer(
+            secret_key, salt='access-token',
+            signer_kwargs={'digest_method': hashlib.sha256})
+
+    def issue(self, user_id):
+        now = round(time.time(), 3)
+        return self._serializer.dumps(
+            {'uid': user_id, 'iat': now, 'exp': int(now) + self.expires_in})
+
+    def verify(self, token):
+        claims = self._claims(token)
+        if claims is None or claims['exp'] <= time.time():
+            return None
+        if self.denylist.is_revoked(token, claims['uid'], claims['iat']):
+            return None
+        return Principal(user_id=claims['uid'])
+
+    def revoke(self, token):
+        """
+        Revoke a single token. Returns False if it is not a signed token.
+        """
+        claims = self._claims(token)
+        if claims is None:
+            return False
+        self.denylist.revoke(token, claims['exp'])
+        return True
+
+    def revoke_user(self, user_id):
+        now = time.time()
+        self.denylist.revoke_user(user_id, now, now + self.expires_in)
+
+    def _claims(self, token):
+        try:
+            claims = self._serializer.loads(token)
+        except BadSignature:
+            return None
+        if not isinstance(claims, dict) or not {'uid', 'iat', 'exp'} <= claims.keys():
+            return None
+        return claims
+
+
+def is_signed_token(token):
+    # Database tokens are plain base64 and never contain a separator
+    return '.' in token
+
+
+def init_app(app):
+    app.extensions['signed_tokens'] = SignedTokens(
+        app.config['SECRET_KEY'], expires_in=app.config['TOKEN_EXPIRES_IN'])
+
+
+def signed_tokens():
+    return current_app.extensions['signed_tokens']
+
+
+def revoke_user_tokens(user_id):
+    """
+    Make sure no signed token issued to a user so far is accepted again
+    """
+    if has_app_context() and 'signed_tokens' in current_app.extensions:
+        signed_tokens().revoke_user(user_id)
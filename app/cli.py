@@ -0,0 +1,28 @@
+import click
+from .auth.passwords import calibrate
+from .jobs import JobRunner
+
+
+def register(app):
+    @app.cli.command('calibrate-password-hash')
+    @click.option('--target-ms', default=250, show_default=True,
+                  help='Latency budget for hashing one password.')
+    @click.option('--samples', default=5, show_default=True,
+                  help='Timings taken per measurement.')
+    def calibrate_password_hash(target_ms, samples):
+        """Recommend a PBKDF2 iteration count for this host."""
+        result = calibrate(target_ms / 1000,
+                           method=app.config['PASSWORD_HASH_METHOD'],
+                           samples=samples)
+        click.echo('{} takes {:.1f} ms here (current: {} iterations)'.format(
+            result['method'], result['seconds'] * 1000,
+            app.config['PASSWORD_HASH_ITERATIONS']))
+        click.echo('PASSWORD_HASH_ITERATIONS={}'.format(result['iterations']))
+
+    @app.cli.command('run-jobs')
+    def run_jobs():
+        """Run queued and stopped background jobs to the end."""
+        runner = JobRunner(app, backend='inline',
+                           chunk_size=app.config['JOB_CHUNK_SIZE'],
+                           lease=app.config['JOB_LEASE'])
+        click.echo('{} jobs run'.format(runner.resume()))
@@ -0,0 +1,106 @@
+import zlib
+from flask import current_app, request
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Every content coding a response may get, in order of preference when a
+# client accepts several equally
+CODINGS = ('zstd', 'br', 'gzip')
+
+# What gets compressed; anything else, like images, already is or is tiny
+MIMETYPES = ('application/json', 'application/x-ndjson', 'text/plain',
+             'text/html', 'text/csv')
+
+
+class BrotliCompressor(object):
+
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.finish()
+
+
+def available_codings():
+    return [coding for coding in CODINGS
+            if coding == 'gzip'
+            or (coding == 'br' and brotli is not None)
+            or (coding == 'zstd' and zstandard is not None)]
+
+
+def compressor(coding, config):
+    """
+    A new compressor, with compress and flush, for a content coding at the
+    level configured for it
+    """
+    if coding == 'gzip':
+        return zlib.compressobj(config['COMPRESS_GZIP_LEVEL'], zlib.DEFLATED,
+                                16 + zlib.MAX_WBITS)
+    if coding == 'br':
+        return BrotliCompressor(config['COMPRESS_BROTLI_LEVEL'])
+    return zstandard.ZstdCompressor(
+        level=config['COMPRESS_ZSTD_LEVEL']).compressobj()
+
+
+def compressed(compressor, chunks, charset='utf-8'):
+    """
+    Compress a streamed body chunk by chunk as it is sent
+    """
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode(charset)
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def compress_response(response):
+    """
+    Compress a response with the best content coding the client accepts,
+    unless it is smaller than COMPRESS_MIN_SIZE. Streamed responses are
+    compressed as they are sent, whatever their size.
+    """
+    if (response.status_code < 200 or response.status_code in (204, 304)
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    coding = request.accept_encodings.best_match(available_codings())
+    if coding is None:
+        return response
+    config = current_app.config
+    if response.is_streamed:
+        response.response = compressed(compressor(coding, config),
+                                       response.response, response.charset)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < config['COMPRESS_MIN_SIZE']:
+            return response
+        compress = compressor(coding, config)
+        response.set_data(compress.compress(data) + compress.flush())
+    response.headers['Content-Encoding'] = coding
+    tag, weak = response.get_etag()
+    if tag and not weak:
+        # A strong tag stands for these exact bytes
+        response.set_etag('{}-{}'.format(tag, coding))
+    return response
+
+
+def init_app(app):
+    app.after_request(compress_response)
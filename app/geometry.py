@@ -0,0 +1,52 @@
+"""
+Area and perimeter formulas of every shape, in one place.
+
+The formulas only use arithmetic operators and `sqrt`, so they work on
+plain numbers, on whole NumPy columns at once, and on SQLAlchemy column
+expressions when given an SQL `sqrt`.
+"""
+import math
+import numpy as np
+
+
+def sqrt_or_none(value):
+    """
+    math.sqrt for single numbers, but None instead of an error for the
+    square root of a negative number, like SQL's SQRT
+    """
+    return math.sqrt(value) if value >= 0 else None
+
+
+def rectangle_area(length, width):
+    return length * width
+
+
+def rectangle_perimeter(length, width):
+    return (length + width) * 2
+
+
+def square_area(length):
+    return length * length
+
+
+def square_perimeter(length):
+    return length * 4
+
+
+def triangle_area(length1, length2, length3, sqrt=np.sqrt):
+    # Heron's formula
+    half_perimeter = (length1 + length2 + length3) / 2
+    return sqrt(half_perimeter * (half_perimeter - length1)
+                * (half_perimeter - length2) * (half_perimeter - length3))
+
+
+def triangle_perimeter(length1, length2, length3):
+    return length1 + length2 + length3
+
+
+def diamond_area(diagonal1, diagonal2):
+    return diagonal1 * diagonal2 / 2
+
+
+def diamond_perimeter(diagonal1, diagonal2, sqrt=np.sqrt):
+    return 2 * sqrt(diagonal1 * diagonal1 + diagonal2 * diagonal2)
@@ -0,0 +1,179 @@
+import json
+import secrets
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app, has_app_context
+from sqlalchemy import and_, or_
+from . import db
+from .models.job import Job
+
+BACKENDS = ('inline', 'thread')
+
+# Every kind of job, by name
+KINDS = {}
+
+_lock = threading.Lock()
+
+
+class JobKind(ABC):
+    """
+    A kind of job, which does its work a chunk at a time. Each chunk is
+    committed together with the job's progress, so a job resumed after a
+    restart carries on from its last committed chunk.
+    """
+
+    name = None
+
+    def total(self, job, params):
+        """
+        How many units of work the job has, or None if that is not known
+        """
+        return None
+
+    @abstractmethod
+    def step(self, job, params, cursor, limit):
+        """
+        Do up to `limit` units of work from `cursor`, which is None at the
+        start, without committing. Returns the cursor of the next chunk,
+        None when the job is done, and the units of work done.
+        """
+
+
+def register_kind(kind):
+    KINDS[kind.name] = kind
+    return kind
+
+
+class JobRunner(object):
+    """
+    Runs jobs outside the request that starts them, on a pool of at most
+    `max_workers` threads ('thread'), so that a few long jobs cannot take
+    every worker away from requests. 'inline' runs a job to the end on the
+    calling thread instead, for tests and `flask run-jobs`.
+    """
+
+    def __init__(self, app, backend='thread', max_workers=1, chunk_size=1000,
+                 lease=300):
+        if backend not in BACKENDS:
+            raise ValueError('unknown job backend: ' + backend)
+        self.app = app
+        self.backend = backend
+        self.chunk_size = chunk_size
+        self.lease = timedelta(seconds=lease)
+        self._executor = None
+        if backend == 'thread':
+            self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                                thread_name_prefix='job')
+
+    @classmethod
+    def from_config(cls, app):
+        config = app.config
+        return cls(app, backend=config['JOB_BACKEND'],
+                   max_workers=config['JOB_WORKERS'],
+                   chunk_size=config['JOB_CHUNK_SIZE'],
+                   lease=config['JOB_LEASE'])
+
+    def submit(self, job_id):
+        if self._executor is None:
+            self.run(job_id)
+        else:
+            self._executor.submit(self.run, job_id)
+
+    def resume(self):
+        """
+        Submit every job that is queued, or running without having
+        committed a chunk for a lease, as the jobs of a stopped process are.
+        Returns how many there were.
+        """
+        jobs = self._resumable().with_entities(Job.job_id).all()
+        for job in jobs:
+            self.submit(job.job_id)
+        return len(jobs)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def run(self, job_id):
+        if has_app_context() and current_app._get_current_object() is self.app:
+            self._run(job_id)
+        else:
+            with self.app.app_context():
+                self._run(job_id)
+
+    def _resumable(self):
+        stale = datetime.utcnow() - self.lease
+        return Job.query.filter(or_(
+            Job.state == 'queued',
+            and_(Job.state == 'running', Job.updated_at < stale)))
+
+    def _run(self, job_id):
+        # Claim the job, so that no other runner works on it too
+        claimed = self._resumable().filter(Job.job_id == job_id).update(
+            {Job.state: 'running'}, synchronize_session=False)
+        db.session.commit()
+        if not claimed:
+            return
+        job = Job.query.get(job_id)
+        db.session.refresh(job)
+        kind = KINDS[job.kind]
+        params = json.loads(job.params or 'null')
+        cursor = json.loads(job.cursor or 'null')
+        try:
+            if job.total is None:
+                job.total = kind.total(job, params)
+            while True:
+                cursor, done = kind.step(job, params, cursor, self.chunk_size)
+                job.done += done
+                job.cursor = json.dumps(cursor)
+                if cursor is None:
+                    job.state = 'finished'
+                db.session.commit()
+                if cursor is None:
+                    return
+        except Exception as error:
+            self.app.logger.exception('job %s failed', job_id)
+            db.session.rollback()
+            job.state = 'failed'
+            job.error = str(error)[:255]
+            db.session.commit()
+
+
+def job_runner():
+    """
+    The current app's runner, created on first use so that configuration
+    changes made after create_app still apply
+    """
+    runner = current_app.extensions.get('job_runner')
+    if runner is None:
+        with _lock:
+            runner = current_app.extensions.get('job_runner')
+            if runner is None:
+                runner = JobRunner.from_config(current_app._get_current_object())
+                current_app.extensions['job_runner'] = runner
+    return runner
+
+
+def start_job(kind, user_id, params=None):
+    """
+    Store a new job of a kind for a user and submit it
+    """
+    job = Job(job_id=secrets.token_hex(16), user_id=user_id, kind=kind,
+              params=json.dumps(params))
+    db.session.add(job)
+    db.session.commit()
+    job_runner().submit(job.job_id)
+    return job
+
+
+def resume_jobs():
+    # Jobs of a process that stopped carry on in the next one
+    runner = job_runner()
+    if runner.backend == 'thread':
+        runner.resume()
+
+
+def init_app(app):
+    app.before_first_request(resume_jobs)
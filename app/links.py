@@ -0,0 +1,63 @@
+from collections import Counter
+from flask import _request_ctx_stack, current_app, url_for
+from werkzeug.routing import parse_converter_args, parse_rule
+from werkzeug.urls import url_quote
+
+
+class LinkTemplates(object):
+    """
+    The URL pattern of every endpoint of a blueprint, resolved once when the
+    app starts, so that the _links of each object are built by formatting
+    strings instead of a trip through werkzeug's URL map. The links are the
+    same as url_for's.
+    """
+
+    def __init__(self, url_map, blueprint):
+        rules = [rule for rule in url_map.iter_rules()
+                 if rule.endpoint.startswith(blueprint + '.')]
+        counts = Counter(rule.endpoint for rule in rules)
+        self._templates = {}
+        for rule in rules:
+            # url_for picks between several rules of an endpoint by the
+            # values given, and fills in defaults; leave those to it
+            if counts[rule.endpoint] > 1 or rule.defaults or rule.subdomain or rule.host:
+                continue
+            self._templates[rule.endpoint] = compile_rule(url_map, rule.rule)
+
+    def url_for(self, endpoint, **values):
+        template = self._templates.get(endpoint)
+        ctx = _request_ctx_stack.top
+        if template is None or ctx is None or ctx.url_adapter is None:
+            return url_for(endpoint, **values)
+        return ctx.url_adapter.script_name.rstrip('/') + template(values)
+
+
+def compile_rule(url_map, rule):
+    """
+    A function building the path of `rule` from a dict of its arguments
+    """
+    pattern = ''
+    converters = []
+    for converter, arguments, variable in parse_rule(rule):
+        if converter is None:
+            static = url_quote(variable.encode(url_map.charset), safe='/:|+')
+            pattern += static.replace('{', '{{').replace('}', '}}')
+            continue
+        args, kwargs = parse_converter_args(arguments) if arguments else ((), {})
+        converters.append(
+            (variable, url_map.converters[converter](url_map, *args, **kwargs).to_url))
+        pattern += '{}'
+
+    def build(values):
+        return pattern.format(*[to_url(values[variable])
+                                for variable, to_url in converters])
+
+    return build
+
+
+def init_app(app):
+    app.extensions['link_templates'] = LinkTemplates(app.url_map, 'api')
+
+
+def link_templates():
+    return current_app.extensions['link_templates']
@@ -1,9 +1,9 @@
-import math
-from app import db
-from flask import url_for
+from datetime import datetime
+from app import db, geometry
+from .shape import Messages, Shape
 
 
-class Diamond(db.Model):
+class Diamond(Shape, db.Model):
     """
     Create a Diamond table
     """
@@ -16,45 +16,34 @@ class Diamond(db.Model):
     diagonal1 = db.Column(db.Float)
     diagonal2 = db.Column(db.Float)
     user_id = db.Column(db.Integer, db.ForeignKey(
-        'users.user_id'), nullable=False)
-
-    def __init__(self, diagonal1=None, diagonal2=None, user_id=None):
-        self.diagonal1 = diagonal1
-        self.diagonal2 = diagonal2
-        self.user_id = user_id
+        'users.user_id', ondelete='CASCADE'), nullable=False)
+    # Maintained on write so that the database can filter and sort on them
+    area = db.Column(db.Float(precision=53))
+    perimeter = db.Column(db.Float(precision=53))
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bumped by every update, and checked by it, so a stale write fails
+    version = db.Column(db.Integer, nullable=False, default=1)
+
+    __mapper_args__ = {'version_id_col': version}
+
+    __table_args__ = (
+        db.Index('ix_diamonds_user_id_area', 'user_id', 'area'),
+        db.Index('ix_diamonds_user_id_perimeter', 'user_id', 'perimeter'),
+        db.Index('ix_diamonds_user_id_updated_at', 'user_id', 'updated_at')
+    )
+
+    name = 'diamond'
+    plural = 'diamonds'
+    dimensions = ('diagonal1', 'diagonal2')
+    messages = Messages(missing='must include diagonal1 and diagonal2 fields',
+                        not_number='diagonal1 and diagonal2 must be numbers',
+                        not_positive='diagonal1 and diagonal2 must be positive')
 
     def __repr__(self):
         return '<Diamond: {} x {}>'.format(self.diagonal1, self.diagonal2)
 
-    def get_area(self):
-        area = self.diagonal1 * self.diagonal2 / 2
-        data = {'Area': area}
-        return data
-
-    def get_perimeter(self):
-        perimeter = 2 * math.sqrt(self.diagonal1 ** 2 + self.diagonal2 ** 2)
-        data = {'Perimeter': perimeter}
-        return data
-
-    def to_dict(self):
-        data = {
-            'diamond_id': self.diamond_id,
-            'user_id': self.user_id,
-            'diagonal1': self.diagonal1,
-            'diagonal2': self.diagonal2,
-            '_links': {
-                'owner': url_for('api.get_user_by_user_id', user_id=self.user_id),
-                'self': url_for('api.get_diamond', diamond_id=self.diamond_id),
-                'area': url_for('api.get_diamond_area', diamond_id=self.diamond_id),
-                'perimeter': url_for('api.get_diamond_perimeter', diamond_id=self.diamond_id),
-                'update': url_for('api.update_diamond', diamond_id=self.diamond_id),
-                'delete': url_for('api.del_diamond', diamond_id=self.diamond_id)
-            }
-        }
-        return data
-
-    def from_dict(self, data, user_id):
-        for field in ['diagonal1', 'diagonal2']:
-            if field in data and data[field]:
-                setattr(self, field, data[field])
-        self.user_id = user_id
+    @staticmethod
+    def measure(diagonal1, diagonal2, sqrt=geometry.sqrt_or_none):
+        return (geometry.diamond_area(diagonal1, diagonal2),
+                geometry.diamond_perimeter(diagonal1, diagonal2, sqrt=sqrt))
@@ -0,0 +1,50 @@
+from datetime import datetime
+from app import db
+from app.links import link_templates
+
+
+class ImportCheckpoint(db.Model):
+    """
+    Create an ImportCheckpoint table, recording how far an import got so
+    that an interrupted one can be resumed
+    """
+
+    # Ensures table will be named in plural and not in singular
+    # as is the name of the model
+    __tablename__ = 'import_checkpoints'
+
+    user_id = db.Column(db.Integer, db.ForeignKey(
+        'users.user_id', ondelete='CASCADE'), primary_key=True)
+    import_id = db.Column(db.String(64), primary_key=True)
+    # Lines of the import stream whose shapes are committed
+    lines = db.Column(db.Integer, nullable=False, default=0)
+    created = db.Column(db.Integer, nullable=False, default=0)
+    finished = db.Column(db.Boolean, nullable=False, default=False)
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __init__(self, user_id=None, import_id=None):
+        self.user_id = user_id
+        self.import_id = import_id
+        self.lines = 0
+        self.created = 0
+        self.finished = False
+
+    def __repr__(self):
+        return '<ImportCheckpoint: {} line {}>'.format(self.import_id, self.lines)
+
+    def to_dict(self):
+        url_for = link_templates().url_for
+        data = {
+            'import_id': self.import_id,
+            'user_id': self.user_id,
+            'lines': self.lines,
+            'created': self.created,
+            'finished': self.finished,
+            '_links': {
+                'owner': url_for('api.get_user_by_user_id', user_id=self.user_id),
+                'self': url_for('api.get_import', user_id=self.user_id, import_id=self.import_id),
+                'resume': url_for('api.import_user_shapes', user_id=self.user_id, import_id=self.import_id)
+            }
+        }
+        return data
@@ -0,0 +1,64 @@
+from datetime import datetime
+from app import db
+from app.links import link_templates
+
+
+class Job(db.Model):
+    """
+    Create a Job table, recording the state and progress of work run
+    outside the request that started it, so that it can be polled and
+    resumed
+    """
+
+    # Ensures table will be named in plural and not in singular
+    # as is the name of the model
+    __tablename__ = 'jobs'
+
+    job_id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey(
+        'users.user_id', ondelete='CASCADE'), nullable=False, index=True)
+    kind = db.Column(db.String(32), nullable=False)
+    # 'queued', 'running', 'finished' or 'failed'
+    state = db.Column(db.String(16), nullable=False)
+    # JSON: what the job works on, and where its next chunk starts
+    params = db.Column(db.Text)
+    cursor = db.Column(db.Text)
+    done = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer)
+    error = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Moved by every committed chunk, which tells a stopped job apart
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_jobs_state_updated_at', 'state', 'updated_at'),
+    )
+
+    def __init__(self, job_id=None, user_id=None, kind=None, params=None):
+        self.job_id = job_id
+        self.user_id = user_id
+        self.kind = kind
+        self.state = 'queued'
+        self.params = params
+        self.done = 0
+
+    def __repr__(self):
+        return '<Job: {} {}>'.format(self.kind, self.state)
+
+    def to_dict(self):
+        url_for = link_templates().url_for
+        data = {
+            'job_id': self.job_id,
+            'user_id': self.user_id,
+            'kind': self.kind,
+            'state': self.state,
+            'done': self.done,
+            'total': self.total,
+            'error': self.error,
+            '_links': {
+                'owner': url_for('api.get_user_by_user_id', user_id=self.user_id),
+                'self': url_for('api.get_job', job_id=self.job_id)
+            }
+        }
+        return data
@@ -1,8 +1,9 @@
-from app import db
-from flask import url_for
+from datetime import datetime
+from app import db, geometry
+from .shape import Messages, Shape
 
 
-class Rectangle(db.Model):
+class Rectangle(Shape, db.Model):
     """
     Create a Rectangle table
     """
@@ -15,45 +16,48 @@ class Rectangle(db.Model):
     length = db.Column(db.Float)
     width = db.Column(db.Float)
     user_id = db.Column(db.Integer, db.ForeignKey(
-        'users.user_id'), nullable=False)
-
-    def __init__(self, length=None, width=None, user_id=None):
-        self.length = length
-        self.width = width
-        self.user_id = user_id
+        'users.user_id', ondelete='CASCADE'), nullable=False)
+    # Maintained on write so that the database can filter and sort on them
+    area = db.Column(db.Float(precision=53))
+    perimeter = db.Column(db.Float(precision=53))
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bumped by every update, and checked by it, so a stale write fails
+    version = db.Column(db.Integer, nullable=False, default=1)
+    # 'square' whenever the sides are equal, kept so on every write, so that
+    # squares and other rectangles are listed through an index
+    shape_type = db.Column(db.String(16), nullable=False)
+
+    __mapper_args__ = {
+        'version_id_col': version,
+        'polymorphic_on': shape_type,
+        'polymorphic_identity': 'rectangle'
+    }
+
+    __table_args__ = (
+        db.Index('ix_rectangles_user_id_area', 'user_id', 'area'),
+        db.Index('ix_rectangles_user_id_perimeter', 'user_id', 'perimeter'),
+        db.Index('ix_rectangles_user_id_updated_at', 'user_id', 'updated_at'),
+        db.Index('ix_rectangles_user_id_shape_type', 'user_id', 'shape_type')
+    )
+
+    name = 'rectangle'
+    plural = 'rectangles'
+    dimensions = ('length', 'width')
+    messages = Messages(missing='must include length and width fields',
+                        not_number='length and width must be numbers',
+                        not_positive='length and width must be positive')
 
     def __repr__(self):
         return '<Rectangle: {} x {}>'.format(self.length, self.width)
 
-    def get_area(self):
-        area = self.length * self.width
-        data = {'Area': area}
-        return data
-
-    def get_perimeter(self):
-        perimeter = (self.length + self.width) * 2
-        data = {'Perimeter': perimeter}
-        return data
-
-    def to_dict(self):
-        data = {
-            'rectangle_id': self.rectangle_id,
-            'user_id': self.user_id,
-            'length': self.length,
-            'width': self.width,
-            '_links': {
-                'owner': url_for('api.get_user_by_user_id', user_id=self.user_id),
-                'self': url_for('api.get_rectangle', rectangle_id=self.rectangle_id),
-                'area': url_for('api.get_rectangle_area', rectangle_id=self.rectangle_id),
-                'perimeter': url_for('api.get_rectangle_perimeter', rectangle_id=self.rectangle_id),
-                'update': url_for('api.update_rectangle', rectangle_id=self.rectangle_id),
-                'delete': url_for('api.del_rectangle', rectangle_id=self.rectangle_id)
-            }
-        }
-        return data
-
-    def from_dict(self, data, user_id):
-        for field in ['length', 'width']:
-            if field in data and data[field]:
-                setattr(self, field, data[field])
-        self.user_id = user_id
+    @staticmethod
+    def discriminate(columns, where=None):
+        where = where or (lambda condition, a, b: a if condition else b)
+        return {'shape_type': where(columns['length'] == columns['width'],
+                                    'square', 'rectangle')}
+
+    @staticmethod
+    def measure(length, width, sqrt=None):
+        return (geometry.rectangle_area(length, width),
+                geometry.rectangle_perimeter(length, width))
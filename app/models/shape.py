@@ -0,0 +1,153 @@
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from app.links import link_templates
+
+# What a shape's validator answers when dimensions are missing, are not
+# numbers or are not positive
+Messages = namedtuple('Messages', ['missing', 'not_number', 'not_positive'])
+
+
+class Shape(object):
+    """
+    Behaviour shared by every shape model. Each shape declares its name,
+    plural, dimensions, validation messages and `measure` formula once;
+    the routes, validators, serializer and batch kernels are derived from
+    that declaration.
+
+    `measure(*dimensions, sqrt=None)`, a static method every shape defines,
+    returns the area and perimeter from the dimensions in declaration
+    order. They may be numbers, NumPy arrays or SQL expressions, given a
+    matching `sqrt`.
+    """
+
+    name = None
+    plural = None
+    dimensions = ()
+    messages = None
+
+    def __init__(self, *values, user_id=None, **dimensions):
+        if len(values) > len(self.dimensions):
+            raise TypeError('{} has {} dimensions'.format(
+                self.name, len(self.dimensions)))
+        dimensions.update(zip(self.dimensions, values))
+        self.set_columns(self.columns(dimensions))
+        self.user_id = user_id
+        self.update_measures()
+
+    @classmethod
+    def key(cls):
+        """
+        The primary key column
+        """
+        return cls.__mapper__.primary_key[0]
+
+    @classmethod
+    def owned_by(cls, user_id):
+        return cls.query.filter(cls.user_id == user_id)
+
+    @staticmethod
+    def columns(dimensions):
+        """
+        The column values of some dimension values, which are usually the same
+        """
+        return dict(dimensions)
+
+    @staticmethod
+    def discriminate(columns, where=None):
+        """
+        The discriminator column values of a row with these column values, for
+        shapes that share a table. `where(condition, a, b)` picks between two
+        values for SQL expressions.
+        """
+        return {}
+
+    def set_columns(self, columns):
+        # As the Float columns give them back: committed objects are not
+        # read again, so an int from JSON would otherwise be shown as sent
+        for column, value in columns.items():
+            setattr(self, column, None if value is None else float(value))
+
+    def update_measures(self, model=None):
+        model = model or type(self)
+        values = [getattr(self, field) for field in model.dimensions]
+        if None not in values:
+            self.area, self.perimeter = model.measure(*values)
+            columns = {column.key: getattr(self, column.key)
+                       for column in self.__table__.columns}
+            for column, value in model.discriminate(columns).items():
+                setattr(self, column, value)
+
+    def get_area(self):
+        data = {'Area': self.area}
+        return data
+
+    def get_perimeter(self):
+        data = {'Perimeter': self.perimeter}
+        return data
+
+    @classmethod
+    def field_attributes(cls):
+        """
+        The attribute behind each field of a serialized shape, in order
+        """
+        fields = OrderedDict([(cls.name + '_id', cls.key().key),
+                              ('user_id', 'user_id')])
+        fields.update((field, field) for field in cls.dimensions)
+        return fields
+
+    @classmethod
+    def load_columns(cls, fields=None, links=True):
+        """
+        The columns to select for `serializer(fields, links)`. The primary
+        key and version are always included, for cursors and ETags.
+        """
+        attributes = cls.field_attributes()
+        names = [attributes[field] for field in fields or attributes]
+        names += [cls.key().key, 'version'] + (['user_id'] if links else [])
+        return [getattr(cls, name) for name in OrderedDict.fromkeys(names)]
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def serializer(cls, fields=None, links=True):
+        """
+        A function turning a shape, or a row of its `load_columns`, into a
+        dict with only the requested fields (a tuple), and with or without
+        _links. Built once per combination.
+        """
+        attributes = cls.field_attributes()
+        selected = [(field, attributes[field]) for field in fields or attributes]
+        key, name = cls.key().key, cls.name
+
+        def serialize(item):
+            data = {field: getattr(item, attribute)
+                    for field, attribute in selected}
+            if links:
+                url_for = link_templates().url_for
+                ids = {key: getattr(item, key)}
+                data['_links'] = {
+                    'owner': url_for('api.get_user_by_user_id', user_id=item.user_id),
+                    'self': url_for('api.get_' + name, **ids),
+                    'area': url_for('api.get_{}_area'.format(name), **ids),
+                    'perimeter': url_for('api.get_{}_perimeter'.format(name), **ids),
+                    'update': url_for('api.update_' + name, **ids),
+                    'delete': url_for('api.del_' + name, **ids)
+                }
+            return data
+
+        return serialize
+
+    def to_dict(self):
+        return self.serializer()(self)
+
+    def from_dict(self, data, user_id, model=None):
+        """
+        Set the dimensions in `data` as `model` has them, by default the
+        shape's own class. A square updated as a rectangle may get two
+        different sides, for example.
+        """
+        model = model or type(self)
+        values = {field: data[field] for field in model.dimensions
+                  if field in data and data[field]}
+        self.set_columns(model.columns(values))
+        self.user_id = user_id
+        self.update_measures(model)
@@ -1,5 +1,6 @@
-from flask import url_for
+from app import geometry
 from .rectangle import Rectangle
+from .shape import Messages
 
 
 class Square(Rectangle):
@@ -7,31 +8,33 @@ class Square(Rectangle):
     Square class extending Rectangle
     """
 
-    def __init__(self, length=None, user_id=None):
-        self.length = length
-        self.width = length
-        self.user_id = user_id
+    __mapper_args__ = {'polymorphic_identity': 'square'}
+
+    name = 'square'
+    plural = 'squares'
+    dimensions = ('length',)
+    messages = Messages(missing='must include length field',
+                        not_number='length must be a number',
+                        not_positive='length must be positive')
 
     def __repr__(self):
         return '<Square: {} x {}>'.format(self.length, self.width)
 
-    def to_dict(self):
-        data = {
-            'square_id': self.rectangle_id,
-            'user_id': self.user_id,
-            'length': self.length,
-            '_links': {
-                'owner': url_for('api.get_user_by_user_id', user_id=self.user_id),
-                'self': url_for('api.get_square', rectangle_id=self.rectangle_id),
-                'area': url_for('api.get_square_area', rectangle_id=self.rectangle_id),
-                'perimeter': url_for('api.get_square_perimeter', rectangle_id=self.rectangle_id),
-                'update': url_for('api.update_square', rectangle_id=self.rectangle_id),
-                'delete': url_for('api.del_square', rectangle_id=self.rectangle_id)
-            }
-        }
-        return data
-
-    def from_dict(self, data, user_id):
-        self.length = data['length']
-        self.width = data['length']
-        self.user_id = user_id
+    @classmethod
+    def owned_by(cls, user_id):
+        # Squares share the rectangles table. Spelled out because bulk
+        # updates and deletes do not add the discriminator themselves.
+        return super().owned_by(user_id).filter(cls.shape_type == cls.name)
+
+    @staticmethod
+    def columns(dimensions):
+        # Width first: MySQL lets later assignments of an UPDATE see the new
+        # values of earlier ones, so `length` must not be assigned before an
+        # expression that reads it is copied to `width`
+        if 'length' not in dimensions:
+            return {}
+        return {'width': dimensions['length'], 'length': dimensions['length']}
+
+    @staticmethod
+    def measure(length, sqrt=None):
+        return geometry.square_area(length), geometry.square_perimeter(length)
@@ -1,9 +1,9 @@
-import math
-from flask import url_for
-from app import db
+from datetime import datetime
+from app import db, geometry
+from .shape import Messages, Shape
 
 
-class Triangle(db.Model):
+class Triangle(Shape, db.Model):
     """
     Create a Triangle table
     """
@@ -17,49 +17,37 @@ class Triangle(db.Model):
     length2 = db.Column(db.Float)
     length3 = db.Column(db.Float)
     user_id = db.Column(db.Integer, db.ForeignKey(
-        'users.user_id'), nullable=False)
-
-    def __init__(self, length1=None, length2=None, length3=None, user_id=None):
-        self.length1 = length1
-        self.length2 = length2
-        self.length3 = length3
-        self.user_id = user_id
+        'users.user_id', ondelete='CASCADE'), nullable=False)
+    # Maintained on write so that the database can filter and sort on them
+    area = db.Column(db.Float(precision=53))
+    perimeter = db.Column(db.Float(precision=53))
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bumped by every update, and checked by it, so a stale write fails
+    version = db.Column(db.Integer, nullable=False, default=1)
+
+    __mapper_args__ = {'version_id_col': version}
+
+    __table_args__ = (
+        db.Index('ix_triangles_user_id_area', 'user_id', 'area'),
+        db.Index('ix_triangles_user_id_perimeter', 'user_id', 'perimeter'),
+        db.Index('ix_triangles_user_id_updated_at', 'user_id', 'updated_at')
+    )
+
+    name = 'triangle'
+    plural = 'triangles'
+    dimensions = ('length1', 'length2', 'length3')
+    messages = Messages(missing='must include length1, length2, and length3 fields',
+                        not_number='length must be numbers',
+                        not_positive='length must be positive')
 
     def __repr__(self):
         return '<Triangle: {} - {} - {}>'.format(self.length1, self.length2, self.length3)
 
-    def get_area(self):
-        halfPerimeter = (self.length1 + self.length2 + self.length3) / 2
-        area = math.sqrt(halfPerimeter * (halfPerimeter - self.length1)
-                         * (halfPerimeter - self.length2) * (halfPerimeter - self.length3))
-        data = {'Area': area}
-        return data
-
-    def get_perimeter(self):
-        perimeter = self.length1 + self.length2 + self.length3
-        data = {'Perimeter': perimeter}
-        return data
-
-    def to_dict(self):
-        data = {
-            'triangle_id': self.triangle_id,
-            'user_id': self.user_id,
-            'length1': self.length1,
-            'length2': self.length2,
-            'length3': self.length3,
-            '_links': {
-                'owner': url_for('api.get_user_by_user_id', user_id=self.user_id),
-                'self': url_for('api.get_triangle', triangle_id=self.triangle_id),
-                'area': url_for('api.get_triangle_area', triangle_id=self.triangle_id),
-                'perimeter': url_for('api.get_triangle_perimeter', triangle_id=self.triangle_id),
-                'update': url_for('api.update_triangle', triangle_id=self.triangle_id),
-                'delete': url_for('api.del_triangle', triangle_id=self.triangle_id)
-            }
-        }
-        return data
-
-    def from_dict(self, data, user_id):
-        for field in ['length1', 'length2', 'length3']:
-            if field in data and data[field]:
-                setattr(self, field, data[field])
-        self.user_id = user_id
+    @staticmethod
+    def measure(length1, length2, length3, sqrt=geometry.sqrt_or_none):
+        """
+        The area is None when the sides cannot make a triangle
+        """
+        return (geometry.triangle_area(length1, length2, length3, sqrt=sqrt),
+                geometry.triangle_perimeter(length1, length2, length3))
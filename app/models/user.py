@@ -1,13 +1,17 @@
 from flask_login import UserMixin
 from app import db
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask import url_for
 import base64
+from collections import OrderedDict
 from datetime import datetime, timedelta
 import os
+from functools import lru_cache
+from app.auth.passwords import hash_password, password_needs_rehash, verify_password
+from app.links import link_templates
 from .rectangle import Rectangle
 from .triangle import Triangle
 from .diamond import Diamond
+from .import_checkpoint import ImportCheckpoint
+from .job import Job
 
 
 class User(UserMixin, db.Model):
@@ -28,12 +32,21 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(128), nullable=False)
     token = db.Column(db.String(32), index=True, unique=True)
     token_expiration = db.Column(db.DateTime)
+    # Bumped by changes to the profile only, not to the token or password
+    # hash, so that logins never make cached profiles stale
+    version = db.Column(db.Integer, nullable=False, default=1)
+    # The database deletes a user's shapes and imports with the user
+    # (ON DELETE CASCADE), so they are never loaded just to be deleted
     rectangles = db.relationship(
-        'Rectangle', cascade='all,delete', backref='users')
+        'Rectangle', cascade='all,delete', passive_deletes=True, backref='users')
     triangle = db.relationship(
-        'Triangle', cascade='all,delete', backref='users')
+        'Triangle', cascade='all,delete', passive_deletes=True, backref='users')
     diamond = db.relationship(
-        'Diamond', cascade='all,delete', backref='users')
+        'Diamond', cascade='all,delete', passive_deletes=True, backref='users')
+    imports = db.relationship(
+        'ImportCheckpoint', cascade='all,delete', passive_deletes=True, backref='users')
+    jobs = db.relationship(
+        'Job', cascade='all,delete', passive_deletes=True, backref='users')
 
     def __repr__(self):
         return '<User: {}>'.format(self.username)
@@ -41,7 +54,7 @@ class User(UserMixin, db.Model):
     def __init__(self, user_name=None, password=None, first_name=None, last_name=None, email=None, token=None, token_expiration=None):
         self.user_name = user_name
         if password is not None:
-            self.password_hash = generate_password_hash(password)
+            self.set_password(password)
         self.first_name = first_name
         self.last_name = last_name
         self.email = email
@@ -52,36 +65,71 @@ class User(UserMixin, db.Model):
         """
         Set password to a hashed password
         """
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def verify_password(self, password):
         """
         Check if hashed password matches actual password
         """
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """
+        Check if the password was hashed with outdated parameters
+        """
+        return password_needs_rehash(self.password_hash)
 
     def get_id(self):
         return (self.user_id)
 
+    # Fields of a serialized user, in order
+    FIELDS = ('user_id', 'user_name', 'email', 'first_name', 'last_name')
+
+    @classmethod
+    def field_attributes(cls):
+        return OrderedDict((field, field) for field in cls.FIELDS)
+
+    @classmethod
+    def load_columns(cls, fields=None, links=True):
+        """
+        The columns to select for `serializer(fields, links)`. The id and
+        version are always included, for ETags.
+        """
+        names = list(fields or cls.FIELDS) + ['user_id', 'version']
+        if links:
+            names.append('user_name')
+        return [getattr(cls, name) for name in OrderedDict.fromkeys(names)]
+
+    @classmethod
+    @lru_cache(maxsize=64)
+    def serializer(cls, fields=None, links=True):
+        """
+        A function turning a user, or a row of its `load_columns`, into a
+        dict with only the requested fields (a tuple), and with or without
+        _links
+        """
+        selected = fields or cls.FIELDS
+
+        def serialize(user):
+            data = {field: getattr(user, field) for field in selected}
+            if links:
+                url_for = link_templates().url_for
+                data['_links'] = {
+                    'self_by_user_name': url_for('api.get_user_by_user_name', user_name=user.user_name),
+                    'self_by_user_id': url_for('api.get_user_by_user_id', user_id=user.user_id),
+                    'update_self_by_user_name': url_for('api.update_user_by_user_name', user_name=user.user_name),
+                    'update_self_by_user_id': url_for('api.update_user_by_user_id', user_id=user.user_id),
+                    'create_rectangle': url_for('api.create_rectangle'),
+                    'create_triangle': url_for('api.create_triangle'),
+                    'create_square': url_for('api.create_square'),
+                    'create_diamond': url_for('api.create_diamond')
+                }
+            return data
+
+        return serialize
+
     def to_dict(self):
-        data = {
-            'user_id': self.user_id,
-            'user_name': self.user_name,
-            'email': self.email,
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            '_links': {
-                'self_by_user_name': url_for('api.get_user_by_user_name', user_name=self.user_name),
-                'self_by_user_id': url_for('api.get_user_by_user_id', user_id=self.user_id),
-                'update_self_by_user_name': url_for('api.update_user_by_user_name', user_name=self.user_name),
-                'update_self_by_user_id': url_for('api.update_user_by_user_id', user_id=self.user_id),
-                'create_rectangle': url_for('api.create_rectangle'),
-                'create_triangle': url_for('api.create_triangle'),
-                'create_square': url_for('api.create_square'),
-                'create_diamond': url_for('api.create_diamond')
-            }
-        }
-        return data
+        return self.serializer()(self)
 
     def from_dict(self, data, new_user=False):
         for field in ['user_name', 'email', 'first_name', 'last_name']:
@@ -0,0 +1,190 @@
+import json
+import math
+from flask import current_app, has_request_context, request
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+PROVIDERS = ('auto', 'orjson', 'stdlib')
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+
+
+def reject_constant(name):
+    # NaN and Infinity are not valid JSON
+    raise ValueError(name)
+
+
+class StdlibJSON(object):
+    """
+    Encodes with the app's JSON encoder, as flask.jsonify does, and decodes
+    with the json module
+    """
+
+    name = 'stdlib'
+
+    def __init__(self, encoder=json.JSONEncoder, sort_keys=True, ensure_ascii=True):
+        self.encoder = encoder
+        self.sort_keys = sort_keys
+        self.ensure_ascii = ensure_ascii
+
+    def dumps(self, data, default=None):
+        return json.dumps(data, cls=self.encoder, default=default,
+                          separators=(',', ':'), sort_keys=self.sort_keys,
+                          ensure_ascii=self.ensure_ascii).encode('utf-8')
+
+    def loads(self, data):
+        return json.loads(data, parse_constant=reject_constant)
+
+
+class OrjsonJSON(object):
+    """
+    Encodes and decodes with orjson. Values orjson leaves to us, including
+    dates so that they keep the format of the app's encoder, go through
+    that encoder.
+    """
+
+    name = 'orjson'
+
+    def __init__(self, encoder=json.JSONEncoder, sort_keys=True):
+        self.default = encoder().default
+        self.option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            self.option |= orjson.OPT_SORT_KEYS
+
+    def dumps(self, data, default=None):
+        return orjson.dumps(data, default=default or self.default,
+                            option=self.option)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+def reject_non_finite(container):
+    # The JSON decoders already refuse NaN and Infinity
+    for value in container.values() if isinstance(container, dict) else container:
+        if isinstance(value, float) and not math.isfinite(value):
+            raise ValueError(repr(value))
+    return container
+
+
+class MessagePack(object):
+    """
+    Encodes and decodes MessagePack, for clients that ask for it. Values
+    msgpack leaves to us go through the app's JSON encoder, so dates are
+    the same strings as in JSON.
+    """
+
+    name = 'msgpack'
+
+    def __init__(self, encoder=json.JSONEncoder):
+        self.default = encoder().default
+
+    def dumps(self, data, default=None):
+        return msgpack.packb(data, default=default or self.default,
+                             use_bin_type=True)
+
+    def loads(self, data):
+        return msgpack.unpackb(data, raw=False, object_hook=reject_non_finite,
+                               list_hook=reject_non_finite)
+
+
+def create_provider(name, encoder=json.JSONEncoder, sort_keys=True, ensure_ascii=True):
+    if name not in PROVIDERS:
+        raise ValueError('unknown JSON provider: ' + name)
+    if name == 'orjson' and orjson is None:
+        raise ValueError('JSON provider orjson is not installed')
+    if name == 'stdlib' or orjson is None:
+        return StdlibJSON(encoder, sort_keys, ensure_ascii)
+    return OrjsonJSON(encoder, sort_keys)
+
+
+def json_provider():
+    """
+    The current app's provider, created on first use so that configuration
+    changes made after create_app still apply
+    """
+    provider = current_app.extensions.get('json_provider')
+    if provider is None:
+        provider = create_provider(current_app.config['JSON_PROVIDER'],
+                                   current_app.json_encoder,
+                                   current_app.config['JSON_SORT_KEYS'],
+                                   current_app.config['JSON_AS_ASCII'])
+        current_app.extensions['json_provider'] = provider
+    return provider
+
+
+def message_pack():
+    provider = current_app.extensions.get('message_pack')
+    if provider is None:
+        provider = MessagePack(current_app.json_encoder)
+        current_app.extensions['message_pack'] = provider
+    return provider
+
+
+def response_mimetype():
+    """
+    The MessagePack mimetype the request accepts rather than JSON, if any,
+    else JSON
+    """
+    if msgpack is None or not has_request_context():
+        return JSON_MIMETYPE
+    return request.accept_mimetypes.best_match(
+        (JSON_MIMETYPE,) + MSGPACK_MIMETYPES, default=JSON_MIMETYPE)
+
+
+def respond(data):
+    """
+    flask.jsonify for a single value, encoded with the configured JSON
+    provider, or as MessagePack if the request accepts that rather than JSON
+    """
+    mimetype = response_mimetype()
+    if mimetype in MSGPACK_MIMETYPES:
+        body = message_pack().dumps(data)
+    else:
+        body = json_provider().dumps(data) + b'\n'
+        mimetype = current_app.config['JSONIFY_MIMETYPE']
+    return current_app.response_class(body, mimetype=mimetype)
+
+
+def get_payload():
+    """
+    request.get_json(), decoding JSON with the configured provider and
+    MessagePack too: None unless the request says it has a body in one of
+    them, and a 400 if it does not parse
+    """
+    if request.is_json:
+        provider = json_provider()
+    elif msgpack is not None and request.mimetype in MSGPACK_MIMETYPES:
+        provider = message_pack()
+    else:
+        return None
+    try:
+        return provider.loads(request.get_data(cache=True))
+    except ValueError as error:
+        return request.on_json_loading_failed(error)
+
+
+def tag_representation(response):
+    """
+    Tell caches the body depends on Accept, and give MessagePack responses
+    their own strong ETag
+    """
+    if msgpack is not None and (response.mimetype == JSON_MIMETYPE
+                                or response.mimetype in MSGPACK_MIMETYPES):
+        response.vary.add('Accept')
+    if response.mimetype in MSGPACK_MIMETYPES:
+        tag, weak = response.get_etag()
+        if tag and not weak:
+            response.set_etag(tag + '-msgpack')
+    return response
+
+
+def init_app(app):
+    app.after_request(tag_representation)
@@ -0,0 +1,93 @@
+"""
+JSON provider benchmark
+
+Compares encoding and decoding with each JSON provider, and with
+MessagePack, on a single shape, a 1k-shape page and a 100k-shape export:
+
+    python -m benchmarks.json_providers --repeat 5
+"""
+import argparse
+import time
+from datetime import datetime
+from flask import json
+from app.payloads import MessagePack, OrjsonJSON, StdlibJSON, msgpack, orjson
+
+SIZES = [('single', 1), ('1k', 1000), ('100k', 100000)]
+
+
+def rectangle(i):
+    return {
+        'rectangle_id': i,
+        'user_id': 1,
+        'length': 1.5 + i,
+        'width': 2.25,
+        'updated_at': datetime(2020, 1, 1),
+        '_links': {
+            'owner': '/api/users/1',
+            'self': '/api/rectangles/{}'.format(i),
+            'area': '/api/rectangles/{}/area'.format(i),
+            'perimeter': '/api/rectangles/{}/perimeter'.format(i),
+            'update': '/api/rectangles/{}'.format(i),
+            'delete': '/api/rectangles/{}'.format(i)
+        }
+    }
+
+
+def payload(size):
+    if size == 1:
+        return rectangle(1)
+    return {'items': [rectangle(i) for i in range(size)],
+            '_links': {'self': '/api/rectangles', 'next': None}}
+
+
+def best(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(provider, repeat):
+    results = []
+    for name, size in SIZES:
+        data = payload(size)
+        encoded = provider.dumps(data)
+        # Time enough calls of the small payloads to measure them
+        loops = max(1, 1000 // size)
+        results.append({
+            'provider': provider.name,
+            'payload': name,
+            'bytes': len(encoded),
+            'dumps_ms': best(lambda: [provider.dumps(data) for _ in range(loops)], repeat) / loops * 1000,
+            'loads_ms': best(lambda: [provider.loads(encoded) for _ in range(loops)], repeat) / loops * 1000
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    providers = [StdlibJSON(json.JSONEncoder)]
+    if orjson is not None:
+        providers.append(OrjsonJSON(json.JSONEncoder))
+    else:
+        print('orjson is not installed, not timing it')
+    if msgpack is not None:
+        providers.append(MessagePack(json.JSONEncoder))
+    else:
+        print('msgpack is not installed, not timing it')
+
+    print('{:<8} {:<8} {:>10} {:>11} {:>11}'.format(
+        'provider', 'payload', 'bytes', 'dumps (ms)', 'loads (ms)'))
+    for provider in providers:
+        for result in run(provider, args.repeat):
+            print('{provider:<8} {payload:<8} {bytes:>10} {dumps_ms:>11.3f} '
+                  '{loads_ms:>11.3f}'.format(**result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Link templates benchmark
+
+Compares building a user's and a shape's _links with flask.url_for against
+the link templates resolved when the app starts:
+
+    python -m benchmarks.link_templates --number 20000
+"""
+import argparse
+import timeit
+from flask import url_for
+from app import create_app
+from app.links import link_templates
+
+LINKS = [
+    ('api.get_user_by_user_name', {'user_name': 'bench'}),
+    ('api.get_user_by_user_id', {'user_id': 1}),
+    ('api.update_user_by_user_name', {'user_name': 'bench'}),
+    ('api.update_user_by_user_id', {'user_id': 1}),
+    ('api.create_rectangle', {}),
+    ('api.get_rectangle', {'rectangle_id': 1}),
+    ('api.get_rectangle_area', {'rectangle_id': 1}),
+    ('api.get_rectangle_perimeter', {'rectangle_id': 1}),
+    ('api.update_rectangle', {'rectangle_id': 1}),
+    ('api.del_rectangle', {'rectangle_id': 1})
+]
+
+
+def run(number):
+    app = create_app('test')
+    with app.test_request_context():
+        templates = link_templates()
+        for endpoint, values in LINKS:
+            assert templates.url_for(endpoint, **values) == url_for(endpoint, **values)
+
+        def with_url_for():
+            for endpoint, values in LINKS:
+                url_for(endpoint, **values)
+
+        def with_templates():
+            build = link_templates().url_for
+            for endpoint, values in LINKS:
+                build(endpoint, **values)
+
+        return {name: min(timeit.repeat(func, number=number, repeat=3)) / number / len(LINKS)
+                for name, func in [('url_for', with_url_for), ('templates', with_templates)]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--number', type=int, default=20000,
+                        help='times to build every link')
+    args = parser.parse_args()
+
+    result = run(args.number)
+    print('{:<10} {:>12}'.format('builder', 'us per link'))
+    for name, seconds in result.items():
+        print('{:<10} {:>12.2f}'.format(name, seconds * 1e6))
+    print('speedup    {:>11.1f}x'.format(result['url_for'] / result['templates']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Login storm benchmark
+
+Measures /api/login throughput, and the latency of shape GETs served while
+those logins are in flight, for each password hash backend:
+
+    python -m benchmarks.login_storm --seconds 10 --logins 8 --readers 4
+"""
+import argparse
+import base64
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from app import create_app, db
+from app.models.rectangle import Rectangle
+from app.models.user import User
+
+USER_NAME = 'bench'
+PASSWORD = 'Str0ngP@ssw0rd'
+TOKEN = 'benchtoken'
+
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def make_app(backend, database):
+    app = create_app('test')
+    app.config.update(SQLALCHEMY_DATABASE_URI='sqlite:///' + database,
+                      PASSWORD_HASH_BACKEND=backend)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(user_name=USER_NAME, password=PASSWORD, token=TOKEN,
+                    token_expiration=datetime(2100, 1, 1))
+        db.session.add(user)
+        db.session.commit()
+        rectangle = Rectangle(length=2, width=3, user_id=user.user_id)
+        db.session.add(rectangle)
+        db.session.commit()
+        return app, rectangle.rectangle_id
+
+
+def run(backend, seconds, logins, readers, database):
+    app, rectangle_id = make_app(backend, database)
+    basic = {'Authorization': 'Basic ' + base64.b64encode(
+        '{}:{}'.format(USER_NAME, PASSWORD).encode()).decode()}
+    bearer = {'Authorization': 'Bearer ' + TOKEN}
+    logged_in = [0] * logins
+    rejected = [0] * logins
+    latencies = [[] for _ in range(readers)]
+    deadline = time.monotonic() + seconds
+
+    def login_worker(i):
+        client = app.test_client()
+        while time.monotonic() < deadline:
+            status = client.get('/api/login', headers=basic).status_code
+            if status == 200:
+                logged_in[i] += 1
+            elif status == 503:
+                rejected[i] += 1
+
+    def read_worker(i):
+        client = app.test_client()
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            client.get('/api/rectangles/{}'.format(rectangle_id),
+                       headers=bearer)
+            latencies[i].append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=login_worker, args=(i,))
+               for i in range(logins)]
+    threads += [threading.Thread(target=read_worker, args=(i,))
+                for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with app.app_context():
+        if 'password_hasher' in app.extensions:
+            app.extensions['password_hasher'].shutdown()
+
+    reads = [latency for worker in latencies for latency in worker]
+    return {
+        'backend': backend,
+        'logins_per_s': sum(logged_in) / seconds,
+        'rejected': sum(rejected),
+        'reads_per_s': len(reads) / seconds,
+        'read_p50_ms': percentile(reads, 50) * 1000,
+        'read_p99_ms': percentile(reads, 99) * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--logins', type=int, default=8,
+                        help='concurrent login clients')
+    parser.add_argument('--readers', type=int, default=4,
+                        help='concurrent shape GET clients')
+    parser.add_argument('--backends', nargs='+',
+                        default=['inline', 'thread', 'process'])
+    args = parser.parse_args()
+
+    print('{:<8} {:>10} {:>9} {:>9} {:>10} {:>10}'.format(
+        'backend', 'logins/s', '503s', 'reads/s', 'p50 (ms)', 'p99 (ms)'))
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in args.backends:
+            result = run(backend, args.seconds, args.logins, args.readers,
+                         os.path.join(directory, backend + '.db'))
+            print('{backend:<8} {logins_per_s:>10.1f} {rejected:>9} '
+                  '{reads_per_s:>9.1f} {read_p50_ms:>10.2f} '
+                  '{read_p99_ms:>10.2f}'.format(**result))
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,69 @@ class Config(object):
     SQLALCHEMY_DATABASE_URI = os.environ.get('SQLALCHEMY_DATABASE_URI')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'IHateThisFluPandemic'
+    # 'database' stores a random token on the user row, 'signed' issues
+    # stateless tokens signed with SECRET_KEY that need no lookup to verify
+    TOKEN_MODE = os.environ.get('TOKEN_MODE') or 'database'
+    TOKEN_EXPIRES_IN = int(os.environ.get('TOKEN_EXPIRES_IN') or 3600)
+
+    # Where password hashing runs: 'inline', 'thread' or 'process'. Pools are
+    # bounded; requests beyond PASSWORD_HASH_MAX_QUEUE get a 503.
+    PASSWORD_HASH_BACKEND = os.environ.get('PASSWORD_HASH_BACKEND') or 'inline'
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 0) or None
+    PASSWORD_HASH_MAX_QUEUE = int(
+        os.environ.get('PASSWORD_HASH_MAX_QUEUE') or 64)
+
+    # Cost of new password hashes. Stored hashes made with other parameters
+    # are upgraded on the next successful login. `flask calibrate-password-hash`
+    # recommends an iteration count for this host.
+    PASSWORD_HASH_METHOD = os.environ.get(
+        'PASSWORD_HASH_METHOD') or 'pbkdf2:sha256'
+    PASSWORD_HASH_ITERATIONS = int(
+        os.environ.get('PASSWORD_HASH_ITERATIONS') or 150000)
+    PASSWORD_SALT_LENGTH = int(os.environ.get('PASSWORD_SALT_LENGTH') or 8)
+
+    # What encodes responses and decodes request bodies: 'orjson', 'stdlib',
+    # or 'auto' for orjson when it is installed and the json module otherwise
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER') or 'auto'
+
+    # Responses are compressed with zstd, brotli (when installed) or gzip if
+    # the client accepts it, unless they are smaller than COMPRESS_MIN_SIZE
+    # bytes. Streamed responses are always compressed.
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE') or 1024)
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL') or 6)
+    COMPRESS_BROTLI_LEVEL = int(os.environ.get('COMPRESS_BROTLI_LEVEL') or 5)
+    COMPRESS_ZSTD_LEVEL = int(os.environ.get('COMPRESS_ZSTD_LEVEL') or 3)
+
+    # Default and largest page size of collection endpoints
+    PAGE_SIZE = int(os.environ.get('PAGE_SIZE') or 100)
+    MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE') or 1000)
+
+    # Most shapes accepted by one POST /api/<shape>/batch request
+    MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE') or 10000)
+
+    # Lines of an NDJSON import inserted and committed together
+    IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE') or 1000)
+
+    # Most dimension tuples accepted by one POST /api/compute/<shape> request
+    MAX_COMPUTE_SIZE = int(os.environ.get('MAX_COMPUTE_SIZE') or 1000000)
+
+    # Background jobs, such as recomputing the stored measures of every shape
+    # of a user, run on at most JOB_WORKERS threads per process ('thread'),
+    # or to the end in the request that starts them ('inline'). They commit
+    # JOB_CHUNK_SIZE rows at a time. A job that has committed nothing for
+    # JOB_LEASE seconds, because its process stopped, is resumed by the next
+    # process to start, or by `flask run-jobs`.
+    JOB_BACKEND = os.environ.get('JOB_BACKEND') or 'thread'
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS') or 1)
+    JOB_CHUNK_SIZE = int(os.environ.get('JOB_CHUNK_SIZE') or 1000)
+    JOB_LEASE = int(os.environ.get('JOB_LEASE') or 300)
+
+    # Bearer token -> user cache, in entries and seconds
+    TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE') or 10000)
+    TOKEN_CACHE_TTL = int(os.environ.get('TOKEN_CACHE_TTL') or 60)
+    # GET /api/tokens/cache shows the counters of the whole process, across
+    # all users, so it is an operator's tool and off unless asked for
+    TOKEN_CACHE_STATS = os.environ.get('TOKEN_CACHE_STATS') == '1'
 
 
 class DevelopmentConfig(Config):
@@ -20,6 +83,9 @@ class DevelopmentConfig(Config):
 
     FLASK_DEBUG = True
     SQLALCHEMY_ECHO = True
+    COMPRESS_GZIP_LEVEL = 1
+    COMPRESS_BROTLI_LEVEL = 1
+    COMPRESS_ZSTD_LEVEL = 1
 
 
 class ProductionConfig(Config):
@@ -39,6 +105,8 @@ class TestConfig(Config):
     TESTING = True
     FLASK_DEBUG = True
     SQLALCHEMY_ECHO = False
+    PASSWORD_HASH_ITERATIONS = 1000
+    JOB_BACKEND = 'inline'
     SQLALCHEMY_DATABASE_URI = os.environ.get('SQLALCHEMY_DATABASE_URI_TEST')
     PRESERVE_CONTEXT_ON_EXCEPTION = False
 
@@ -0,0 +1,44 @@
+"""Cascade user deletes
+
+Revision ID: 2f6b9d4e8a17
+Revises: 7d1a3c5e9f20
+Create Date: 2026-10-18 20:14:09.318552
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '2f6b9d4e8a17'
+down_revision = '7d1a3c5e9f20'
+branch_labels = None
+depends_on = None
+
+# Tables whose rows belong to a user
+TABLES = ('rectangles', 'triangles', 'diamonds', 'import_checkpoints')
+
+# Names the foreign keys created here, and the unnamed ones SQLite reflects
+NAMING_CONVENTION = {
+    'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def replace_user_foreign_keys(ondelete):
+    inspector = sa.inspect(op.get_bind())
+    for table in TABLES:
+        name = 'fk_{}_user_id_users'.format(table)
+        # MySQL named the original keys itself, like rectangles_ibfk_1
+        existing = [key['name'] or name for key in inspector.get_foreign_keys(table)
+                    if key['constrained_columns'] == ['user_id']]
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            for key in existing:
+                batch_op.drop_constraint(key, type_='foreignkey')
+            batch_op.create_foreign_key(name, 'users', ['user_id'], ['user_id'],
+                                        ondelete=ondelete)
+
+
+def upgrade():
+    replace_user_foreign_keys('CASCADE')
+
+
+def downgrade():
+    replace_user_foreign_keys(None)
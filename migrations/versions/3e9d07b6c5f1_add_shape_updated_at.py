@@ -0,0 +1,57 @@
+"""Add shape updated_at
+
+Revision ID: 3e9d07b6c5f1
+Revises: a71c52e0d9b4
+Create Date: 2026-10-18 11:40:03.127554
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3e9d07b6c5f1'
+down_revision = 'a71c52e0d9b4'
+branch_labels = None
+depends_on = None
+
+# Primary keys per UPDATE statement while backfilling
+BACKFILL_BATCH_SIZE = 10000
+
+SHAPES = {
+    'rectangles': 'rectangle_id',
+    'triangles': 'triangle_id',
+    'diamonds': 'diamond_id'
+}
+
+
+def backfill(table_name, key, now):
+    # Existing rows count as changed now, so the next incremental export
+    # picks every one of them up once
+    table = sa.table(table_name, sa.column(key), sa.column('updated_at'))
+    bind = op.get_bind()
+    low, high = bind.execute(sa.select(
+        [sa.func.min(table.c[key]), sa.func.max(table.c[key])])).first()
+    if low is None:
+        return
+    for start in range(low, high + 1, BACKFILL_BATCH_SIZE):
+        bind.execute(table.update().where(
+            table.c[key].between(start, start + BACKFILL_BATCH_SIZE - 1)
+        ).values(updated_at=now))
+
+
+def upgrade():
+    now = datetime.utcnow()
+    for table_name, key in SHAPES.items():
+        op.add_column(table_name, sa.Column(
+            'updated_at', sa.DateTime(), nullable=True))
+        backfill(table_name, key, now)
+        op.create_index('ix_{}_user_id_updated_at'.format(table_name),
+                        table_name, ['user_id', 'updated_at'])
+
+
+def downgrade():
+    for table_name in reversed(list(SHAPES)):
+        op.drop_index('ix_{}_user_id_updated_at'.format(table_name),
+                      table_name=table_name)
+        op.drop_column(table_name, 'updated_at')
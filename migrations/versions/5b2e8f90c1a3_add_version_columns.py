@@ -0,0 +1,29 @@
+"""Add version columns
+
+Revision ID: 5b2e8f90c1a3
+Revises: 8c4f1e2a7d36
+Create Date: 2026-10-18 15:21:09.664301
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5b2e8f90c1a3'
+down_revision = '8c4f1e2a7d36'
+branch_labels = None
+depends_on = None
+
+TABLES = ('users', 'rectangles', 'triangles', 'diamonds')
+
+
+def upgrade():
+    # The server default fills existing rows without a separate backfill
+    for table_name in TABLES:
+        op.add_column(table_name, sa.Column(
+            'version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    for table_name in reversed(TABLES):
+        op.drop_column(table_name, 'version')
@@ -0,0 +1,52 @@
+"""Add rectangle shape_type
+
+Revision ID: 7d1a3c5e9f20
+Revises: 5b2e8f90c1a3
+Create Date: 2026-10-18 18:02:37.415920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '7d1a3c5e9f20'
+down_revision = '5b2e8f90c1a3'
+branch_labels = None
+depends_on = None
+
+# Primary keys per UPDATE statement while backfilling, so that no single
+# statement locks a whole table
+BACKFILL_BATCH_SIZE = 10000
+
+
+def backfill():
+    # Rectangles with equal sides are squares, as they have always been read
+    table = sa.table('rectangles', sa.column('rectangle_id'),
+                     sa.column('length'), sa.column('width'),
+                     sa.column('shape_type'))
+    bind = op.get_bind()
+    low, high = bind.execute(sa.select(
+        [sa.func.min(table.c.rectangle_id), sa.func.max(table.c.rectangle_id)])).first()
+    if low is None:
+        return
+    for start in range(low, high + 1, BACKFILL_BATCH_SIZE):
+        bind.execute(table.update().where(sa.and_(
+            table.c.rectangle_id.between(start, start + BACKFILL_BATCH_SIZE - 1),
+            table.c.length == table.c.width
+        )).values(shape_type='square'))
+
+
+def upgrade():
+    # The server default makes every existing row a rectangle at first
+    op.add_column('rectangles', sa.Column(
+        'shape_type', sa.String(length=16), nullable=False,
+        server_default='rectangle'))
+    backfill()
+    # Built after the backfill, once, instead of maintained row by row
+    op.create_index('ix_rectangles_user_id_shape_type', 'rectangles',
+                    ['user_id', 'shape_type'])
+
+
+def downgrade():
+    op.drop_index('ix_rectangles_user_id_shape_type', table_name='rectangles')
+    op.drop_column('rectangles', 'shape_type')
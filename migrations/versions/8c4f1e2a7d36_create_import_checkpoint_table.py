@@ -0,0 +1,32 @@
+"""Create import checkpoint table
+
+Revision ID: 8c4f1e2a7d36
+Revises: 3e9d07b6c5f1
+Create Date: 2026-10-18 13:05:52.481120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '8c4f1e2a7d36'
+down_revision = '3e9d07b6c5f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('import_checkpoints',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('import_id', sa.String(length=64), nullable=False),
+    sa.Column('lines', sa.Integer(), nullable=False),
+    sa.Column('created', sa.Integer(), nullable=False),
+    sa.Column('finished', sa.Boolean(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'import_id')
+    )
+
+
+def downgrade():
+    op.drop_table('import_checkpoints')
@@ -0,0 +1,78 @@
+"""Add shape area and perimeter
+
+Revision ID: a71c52e0d9b4
+Revises: f223c4393c1e
+Create Date: 2026-10-18 09:12:41.308215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a71c52e0d9b4'
+down_revision = 'f223c4393c1e'
+branch_labels = None
+depends_on = None
+
+# Primary keys per UPDATE statement while backfilling, so that no single
+# statement locks a whole table
+BACKFILL_BATCH_SIZE = 10000
+
+# The formulas as they were when this migration was written, so that later
+# changes to the app cannot change what it does
+SHAPES = {
+    'rectangles': ('rectangle_id', ('length', 'width'),
+                   lambda c: (c.length * c.width,
+                              (c.length + c.width) * 2)),
+    'triangles': ('triangle_id', ('length1', 'length2', 'length3'),
+                  lambda c: (sa.func.sqrt(
+                      (c.length1 + c.length2 + c.length3) / 2
+                      * ((c.length2 + c.length3 - c.length1) / 2)
+                      * ((c.length1 + c.length3 - c.length2) / 2)
+                      * ((c.length1 + c.length2 - c.length3) / 2)),
+                      c.length1 + c.length2 + c.length3)),
+    'diamonds': ('diamond_id', ('diagonal1', 'diagonal2'),
+                 lambda c: (c.diagonal1 * c.diagonal2 / 2,
+                            2 * sa.func.sqrt(c.diagonal1 * c.diagonal1
+                                             + c.diagonal2 * c.diagonal2)))
+}
+
+
+def backfill(table_name, key, dimensions, measure):
+    table = sa.table(table_name, sa.column(key), sa.column('area'),
+                     sa.column('perimeter'),
+                     *[sa.column(dimension) for dimension in dimensions])
+    bind = op.get_bind()
+    low, high = bind.execute(sa.select(
+        [sa.func.min(table.c[key]), sa.func.max(table.c[key])])).first()
+    if low is None:
+        return
+    area, perimeter = measure(table.c)
+    for start in range(low, high + 1, BACKFILL_BATCH_SIZE):
+        bind.execute(table.update().where(
+            table.c[key].between(start, start + BACKFILL_BATCH_SIZE - 1)
+        ).values(area=area, perimeter=perimeter))
+
+
+def upgrade():
+    for table_name, (key, dimensions, measure) in SHAPES.items():
+        op.add_column(table_name, sa.Column(
+            'area', sa.Float(precision=53), nullable=True))
+        op.add_column(table_name, sa.Column(
+            'perimeter', sa.Float(precision=53), nullable=True))
+        backfill(table_name, key, dimensions, measure)
+        # Built after the backfill, once, instead of maintained row by row
+        op.create_index('ix_{}_user_id_area'.format(table_name),
+                        table_name, ['user_id', 'area'])
+        op.create_index('ix_{}_user_id_perimeter'.format(table_name),
+                        table_name, ['user_id', 'perimeter'])
+
+
+def downgrade():
+    for table_name in reversed(list(SHAPES)):
+        op.drop_index('ix_{}_user_id_perimeter'.format(table_name),
+                      table_name=table_name)
+        op.drop_index('ix_{}_user_id_area'.format(table_name),
+                      table_name=table_name)
+        op.drop_column(table_name, 'perimeter')
+        op.drop_column(table_name, 'area')
@@ -7,6 +7,7 @@ PASSWORD_WEAK1 = '1234567890'
 PASSWORD_WEAK2 = 'W3ak!'
 EMAIL_INVALID = 'invalidmail'
 TOKEN_VALID = 'validtoken'
+TOKEN_VALID2 = 'validtoken2'
 TOKEN_INVALID = 'invalidtoken'
 TOKEN_EXPIRATION_VALID = '2050-12-21 20:00:00'
 TOKEN_EXPIRATION_INVALID = '2000-12-21 20:00:00'
@@ -4,6 +4,11 @@ from test.testRectangle import *
 from test.testTriangle import *
 from test.testDiamond import *
 from test.testSquare import *
+from test.testAuth import *
+from test.testGeometry import *
+from test.testLinks import *
+from test.testPayloads import *
+from test.testJobs import *
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,300 @@
+import unittest
+import os
+import json
+from datetime import datetime, timedelta
+from flask_testing import TestCase
+from dotenv import load_dotenv
+from sqlalchemy import event
+from app import create_app, db
+from app.auth.cache import Principal, TokenCache, token_cache
+from app.auth.passwords import HasherBusy, PasswordHasher
+from app.models.user import User
+import test.constants as constants
+import base64
+
+
+class TestTokenCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        """
+        Given more tokens than the cache holds, it should evict the least recently used one
+        """
+        cache = TokenCache(max_size=2, ttl=60)
+        cache.set('a', Principal(user_id=1))
+        cache.set('b', Principal(user_id=2))
+        cache.get('a')
+        cache.set('c', Principal(user_id=3))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), Principal(user_id=1))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_entry_never_outlives_token(self):
+        """
+        Given a token that has already expired, it should not be cached
+        """
+        cache = TokenCache(max_size=2, ttl=60)
+        cache.set('a', Principal(user_id=1),
+                  expires_at=datetime.utcnow() - timedelta(seconds=1))
+        self.assertIsNone(cache.get('a'))
+
+    def test_invalidate_user(self):
+        """
+        Given a user with several cached tokens, it should drop all of them
+        """
+        cache = TokenCache(max_size=10, ttl=60)
+        cache.set('a', Principal(user_id=1))
+        cache.set('b', Principal(user_id=1))
+        cache.set('c', Principal(user_id=2))
+        cache.invalidate_user(1)
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), Principal(user_id=2))
+
+
+class TestPasswordHasher(unittest.TestCase):
+
+    def test_thread_backend(self):
+        """
+        Given the thread backend, it should hash and verify like werkzeug does inline
+        """
+        hasher = PasswordHasher(backend='thread', max_workers=1)
+        password_hash = hasher.hash(constants.PASSWORD_STRONG)
+        self.assertTrue(hasher.verify(password_hash, constants.PASSWORD_STRONG))
+        self.assertFalse(hasher.verify(password_hash, constants.PASSWORD_WEAK1))
+        hasher.shutdown()
+
+    def test_saturated_pool(self):
+        """
+        Given a pool with no free queue slots, it should raise HasherBusy
+        """
+        hasher = PasswordHasher(backend='thread', max_workers=1, max_queue=0)
+        with self.assertRaises(HasherBusy):
+            hasher.hash(constants.PASSWORD_STRONG)
+        hasher.shutdown()
+
+    def test_unknown_backend(self):
+        """
+        Given an unknown backend name, it should raise ValueError
+        """
+        with self.assertRaises(ValueError):
+            PasswordHasher(backend='gpu')
+
+    def test_needs_rehash(self):
+        """
+        Given a hash made with fewer iterations, it should need a rehash
+        """
+        old = PasswordHasher(iterations=1000)
+        new = PasswordHasher(iterations=2000)
+        password_hash = old.hash(constants.PASSWORD_STRONG)
+        self.assertFalse(old.needs_rehash(password_hash))
+        self.assertTrue(new.needs_rehash(password_hash))
+        self.assertTrue(new.verify(password_hash, constants.PASSWORD_STRONG))
+
+
+class TestAuth(TestCase):
+
+    def create_app(self):
+
+        load_dotenv()
+
+        # pass in test configurations
+        config_name = 'test'
+        app = create_app(config_name)
+        app.config.update(
+            SQLALCHEMY_DATABASE_URI=os.environ.get(
+                'SQLALCHEMY_DATABASE_URI_TEST')
+        )
+        return app
+
+    def setUp(self):
+        """
+        Will be called before every test
+        """
+
+        db.create_all()
+        user = User(user_name=constants.USER_NAME,
+                    password=constants.PASSWORD_STRONG,
+                    token=constants.TOKEN_VALID,
+                    token_expiration=constants.TOKEN_EXPIRATION_VALID)
+        db.session.add(user)
+        db.session.commit()
+        self.user_id = user.user_id
+
+    def tearDown(self):
+        """
+        Will be called after every test
+        """
+
+        db.session.remove()
+        db.drop_all()
+
+
+class TestTokenCacheAuth(TestAuth):
+
+    def test_repeated_requests_hit_cache(self):
+        """
+        Given the same token twice, it should only look it up in the database once
+        """
+        headers = {"Authorization": "Bearer " + constants.TOKEN_VALID}
+        self.client.get(f'/api/users/{self.user_id}', headers=headers)
+        self.client.get(f'/api/users/{self.user_id}', headers=headers)
+        stats = token_cache().stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
+
+    def test_logout_invalidates_cache(self):
+        """
+        Given a cached token that is then revoked, it should return status code 401
+        """
+        headers = {"Authorization": "Bearer " + constants.TOKEN_VALID}
+        self.assert200(self.client.get(
+            f'/api/users/{self.user_id}', headers=headers))
+        self.assertEqual(self.client.delete(
+            '/api/logout', headers=headers).status_code, 204)
+        self.assert401(self.client.get(
+            f'/api/users/{self.user_id}', headers=headers))
+
+    def test_logout_invalidates_cache_after_commit(self):
+        """
+        Given a token cached again while its revocation is being committed, it should return status code 401
+        """
+        headers = {"Authorization": "Bearer " + constants.TOKEN_VALID}
+
+        def cache_stale_row(session):
+            # What a concurrent request reading the row before the commit does
+            token_cache().set(constants.TOKEN_VALID, Principal(self.user_id))
+
+        event.listen(db.session, 'before_commit', cache_stale_row)
+        try:
+            self.assertEqual(self.client.delete(
+                '/api/logout', headers=headers).status_code, 204)
+        finally:
+            event.remove(db.session, 'before_commit', cache_stale_row)
+        self.assert401(self.client.get(
+            f'/api/users/{self.user_id}', headers=headers))
+
+    def test_delete_user_invalidates_cache(self):
+        """
+        Given a cached token whose user is deleted, it should return status code 401
+        """
+        headers = {"Authorization": "Bearer " + constants.TOKEN_VALID}
+        self.assertEqual(self.client.delete(
+            f'/api/users/{self.user_id}', headers=headers).status_code, 204)
+        self.assert401(self.client.get(
+            f'/api/users/{self.user_id}', headers=headers))
+
+    def test_get_cache_stats(self):
+        """
+        Given a valid token and TOKEN_CACHE_STATS on, it should return status code 200 and the cache counters
+        """
+        self.app.config.update(TOKEN_CACHE_STATS=True)
+        response = self.client.get(
+            '/api/tokens/cache', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert200(response)
+        for counter in ['hits', 'misses', 'evictions', 'size']:
+            self.assertTrue(counter in response.json)
+
+    def test_get_cache_stats_fail_disabled(self):
+        """
+        Given a valid token and TOKEN_CACHE_STATS off, it should return status code 404
+        """
+        response = self.client.get(
+            '/api/tokens/cache', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert404(response)
+
+
+class TestSignedTokenAuth(TestAuth):
+
+    def create_app(self):
+        app = super().create_app()
+        app.config.update(TOKEN_MODE='signed')
+        return app
+
+    def login(self):
+        credentials = base64.b64encode(f'{constants.USER_NAME}:{constants.PASSWORD_STRONG}'.encode(
+        )).decode('utf-8')
+        response = self.client.get(
+            '/api/login', headers={"Authorization": "Basic " + credentials})
+        self.assert200(response)
+        return {"Authorization": "Bearer " + response.json['token']}
+
+    def test_signed_token_success(self):
+        """
+        Given a signed token, it should return status code 200 without storing the token
+        """
+        headers = self.login()
+        self.assert200(self.client.get(
+            f'/api/users/{self.user_id}', headers=headers))
+        self.assertEqual(User.query.get(self.user_id).token,
+                         constants.TOKEN_VALID)
+
+    def test_signed_token_fail_tampered(self):
+        """
+        Given a signed token whose payload was altered, it should return status code 401
+        """
+        headers = self.login()
+        headers["Authorization"] = headers["Authorization"].replace(
+            '.', 'x.', 1)
+        self.assert401(self.client.get(
+            f'/api/users/{self.user_id}', headers=headers))
+
+    def test_signed_token_logout(self):
+        """
+        Given a signed token that is then revoked, it should return status code 401
+        """
+        headers = self.login()
+        self.assertEqual(self.client.delete(
+            '/api/logout', headers=headers).status_code, 204)
+        self.assert401(self.client.get(
+            f'/api/users/{self.user_id}', headers=headers))
+
+    def test_signed_token_deleted_user(self):
+        """
+        Given a signed token whose user is deleted, it should return status code 401
+        """
+        headers = self.login()
+        self.assertEqual(self.client.delete(
+            f'/api/users/{self.user_id}', headers=headers).status_code, 204)
+        self.assert401(self.client.get(
+            f'/api/users/{self.user_id}', headers=headers))
+
+
+class TestPasswordHasherAuth(TestAuth):
+
+    def test_login_fail_hasher_busy(self):
+        """
+        Given a saturated hashing pool, it should return status code 503 and a Retry-After header
+        """
+        self.app.extensions['password_hasher'] = PasswordHasher(
+            backend='thread', max_workers=1, max_queue=0)
+        credentials = base64.b64encode(f'{constants.USER_NAME}:{constants.PASSWORD_STRONG}'.encode(
+        )).decode('utf-8')
+        response = self.client.get(
+            '/api/login', headers={"Authorization": "Basic " + credentials})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json['error'], 'Service Unavailable')
+        self.assertEqual(response.headers['Retry-After'], '1')
+
+    def test_login_rehashes_outdated_password(self):
+        """
+        Given a password hashed with outdated parameters, it should store a new hash on login
+        """
+        self.app.config.update(PASSWORD_HASH_ITERATIONS=2000)
+        self.app.extensions.pop('password_hasher', None)
+        credentials = base64.b64encode(f'{constants.USER_NAME}:{constants.PASSWORD_STRONG}'.encode(
+        )).decode('utf-8')
+        response = self.client.get(
+            '/api/login', headers={"Authorization": "Basic " + credentials})
+        self.assert200(response)
+        user = User.query.get(self.user_id)
+        self.assertTrue(user.password_hash.startswith('pbkdf2:sha256:2000$'))
+        self.assertTrue(user.verify_password(constants.PASSWORD_STRONG))
+
+    def test_calibrate_command(self):
+        """
+        Given a latency budget, it should recommend an iteration count
+        """
+        result = self.app.test_cli_runner().invoke(
+            args=['calibrate-password-hash', '--target-ms', '5', '--samples', '1'])
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue('PASSWORD_HASH_ITERATIONS=' in result.output)
@@ -267,3 +267,31 @@ class TestDeleteDiamond(TestDiamond):
         response = self.client.delete(
             f'/api/diamonds/{self.diamond_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
         self.assertEqual(response.status_code, 204)
+
+
+class TestBulkDiamonds(TestDiamond):
+
+    def test_bulk_delete_diamonds_filter_success(self):
+        """
+        Given a filter, it should return status code 200 and delete only the matching diamonds
+        """
+        payload = json.dumps({"filter": {"diagonal1": {"gt": constants.NUMBER_VALID}}})
+        response = self.client.delete(
+            '/api/diamonds', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assert200(response)
+        self.assertEqual(response.json['deleted'], 0)
+        self.assertIsNotNone(Diamond.query.get(self.diamond_id))
+
+    def test_bulk_update_diamonds_fail_unknown_operator(self):
+        """
+        Given an unknown filter operator, it should return status code 400 and proper error message
+        """
+        payload = json.dumps({
+            "filter": {"diagonal1": {"like": constants.NUMBER_VALID}},
+            "scale": {"diagonal1": 2}
+        })
+        response = self.client.patch(
+            '/api/diamonds', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assert400(response)
+        self.assertEqual(response.json['message'],
+                         'unknown filter operator like')
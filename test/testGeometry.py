@@ -0,0 +1,146 @@
+import unittest
+import os
+import json
+import numpy as np
+from flask_testing import TestCase
+from dotenv import load_dotenv
+from app import create_app, db, geometry
+from app.models.diamond import Diamond
+from app.models.triangle import Triangle
+from app.models.user import User
+import test.constants as constants
+
+
+class TestKernels(unittest.TestCase):
+
+    def test_kernels_match_model_methods(self):
+        """
+        Given columns of dimensions, it should compute what the model methods compute one by one
+        """
+        sides = np.array([[3.0, 4.0, 5.0], [3.5, 3.5, 3.5], [2.0, 5.5, 6.0]])
+        areas = geometry.triangle_area(sides[:, 0], sides[:, 1], sides[:, 2])
+        for row, area in zip(sides, areas):
+            self.assertEqual(Triangle(*row).get_area()['Area'], area)
+        diagonals = np.array([[3.5, 5.5], [1.0, 2.0]])
+        perimeters = geometry.diamond_perimeter(
+            diagonals[:, 0], diagonals[:, 1])
+        for row, perimeter in zip(diagonals, perimeters):
+            self.assertEqual(Diamond(*row).get_perimeter()
+                             ['Perimeter'], perimeter)
+
+
+class TestCompute(TestCase):
+
+    def create_app(self):
+
+        load_dotenv()
+
+        # pass in test configurations
+        config_name = 'test'
+        app = create_app(config_name)
+        app.config.update(
+            SQLALCHEMY_DATABASE_URI=os.environ.get(
+                'SQLALCHEMY_DATABASE_URI_TEST')
+        )
+        return app
+
+    def setUp(self):
+        """
+        Will be called before every test
+        """
+
+        db.create_all()
+        user = User(user_name=constants.USER_NAME,
+                    password=constants.PASSWORD_STRONG,
+                    token=constants.TOKEN_VALID,
+                    token_expiration=constants.TOKEN_EXPIRATION_VALID)
+        db.session.add(user)
+        db.session.commit()
+
+    def tearDown(self):
+        """
+        Will be called after every test
+        """
+
+        db.session.remove()
+        db.drop_all()
+
+    def test_compute_rectangles_success(self):
+        """
+        Given columns of lengths and widths, it should return status code 200 and columns of areas and perimeters
+        """
+        payload = json.dumps({
+            "length": [constants.NUMBER_VALID, constants.NUMBER_VALID2],
+            "width": [constants.NUMBER_VALID2, 2]
+        })
+        response = self.client.post(
+            '/api/compute/rectangles', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assert200(response)
+        self.assertEqual(response.json['area'], [
+                         constants.NUMBER_VALID * constants.NUMBER_VALID2, constants.NUMBER_VALID2 * 2])
+        self.assertEqual(response.json['perimeter'], [
+                         (constants.NUMBER_VALID + constants.NUMBER_VALID2) * 2, (constants.NUMBER_VALID2 + 2) * 2])
+
+    def test_compute_triangles_impossible_sides(self):
+        """
+        Given sides that cannot form a triangle, it should return a null area
+        """
+        payload = json.dumps({
+            "length1": [3, 1],
+            "length2": [4, 1],
+            "length3": [5, 5]
+        })
+        response = self.client.post(
+            '/api/compute/triangles', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assert200(response)
+        self.assertEqual(response.json['area'], [6.0, None])
+        self.assertEqual(response.json['perimeter'], [12.0, 7.0])
+
+    def test_compute_fail_non_numbers(self):
+        """
+        Given a column that is not all numbers, it should return status code 400 and proper error message
+        """
+        payload = json.dumps({
+            "diagonal1": [constants.NUMBER_VALID, constants.NUMBER_NOT],
+            "diagonal2": [constants.NUMBER_VALID, constants.NUMBER_VALID]
+        })
+        response = self.client.post(
+            '/api/compute/diamonds', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assert400(response)
+        self.assertEqual(response.json['message'],
+                         'diagonal1 must be a list of numbers')
+
+    def test_compute_fail_non_finite(self):
+        """
+        Given NaN, Infinity or a number too large for a float, it should return status code 400
+        """
+        self.app.config.update(JSON_PROVIDER='stdlib')
+        self.app.extensions.pop('json_provider', None)
+        for length in ['NaN', 'Infinity', '1e400']:
+            response = self.client.post(
+                '/api/compute/rectangles', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"},
+                data='{"length": [%s], "width": [2]}' % length)
+            self.assert400(response)
+        self.assertEqual(response.json['message'], 'length must be finite')
+
+    def test_compute_fail_different_lengths(self):
+        """
+        Given columns of different lengths, it should return status code 400 and proper error message
+        """
+        payload = json.dumps({
+            "diagonal1": [constants.NUMBER_VALID],
+            "diagonal2": [constants.NUMBER_VALID, constants.NUMBER_VALID]
+        })
+        response = self.client.post(
+            '/api/compute/diamonds', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assert400(response)
+        self.assertEqual(response.json['message'],
+                         'diagonal1, diagonal2 must have the same length')
+
+    def test_compute_fail_unknown_shape(self):
+        """
+        Given an unknown shape, it should return status code 400
+        """
+        response = self.client.post(
+            '/api/compute/circles', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data='{}')
+        self.assert400(response)
@@ -0,0 +1,180 @@
+import os
+import json
+from datetime import datetime, timedelta
+from flask_testing import TestCase
+from dotenv import load_dotenv
+from app import create_app, db
+from app.jobs import JobRunner
+from app.models.job import Job
+from app.models.rectangle import Rectangle
+from app.models.triangle import Triangle
+from app.models.user import User
+import test.constants as constants
+
+
+class TestJobs(TestCase):
+
+    def create_app(self):
+
+        load_dotenv()
+
+        # pass in test configurations
+        config_name = 'test'
+        app = create_app(config_name)
+        app.config.update(
+            SQLALCHEMY_DATABASE_URI=os.environ.get(
+                'SQLALCHEMY_DATABASE_URI_TEST'),
+            JOB_CHUNK_SIZE=2
+        )
+        return app
+
+    def setUp(self):
+        """
+        Will be called before every test
+        """
+
+        db.create_all()
+        user = User(user_name=constants.USER_NAME,
+                    password=constants.PASSWORD_STRONG,
+                    token=constants.TOKEN_VALID,
+                    token_expiration=constants.TOKEN_EXPIRATION_VALID)
+        other = User(user_name=constants.USER_NAME2,
+                     password=constants.PASSWORD_STRONG,
+                     token=constants.TOKEN_VALID2,
+                     token_expiration=constants.TOKEN_EXPIRATION_VALID)
+        db.session.add_all([user, other])
+        db.session.commit()
+        self.user_id = user.user_id
+        db.session.add_all([Rectangle(i, 2, user_id=self.user_id) for i in range(1, 6)]
+                           + [Triangle(3, 4, 5, user_id=self.user_id)])
+        db.session.commit()
+        # Stored measures gone stale, as after a change of formula
+        for model in (Rectangle, Triangle):
+            model.query.update({model.area: 0, model.perimeter: 0},
+                               synchronize_session=False)
+        db.session.commit()
+
+    def tearDown(self):
+        """
+        Will be called after every test
+        """
+
+        db.session.remove()
+        db.drop_all()
+
+    def assert_recomputed(self):
+        db.session.expire_all()
+        for rectangle in Rectangle.query.all():
+            self.assertEqual(rectangle.area, rectangle.length * 2)
+        self.assertEqual(Triangle.query.one().area, 6)
+
+    def add_job(self, state, updated_at, cursor=None):
+        job = Job(job_id='a' * 32, user_id=self.user_id,
+                  kind='recompute_measures', params='null')
+        job.state = state
+        job.cursor = cursor
+        db.session.add(job)
+        db.session.commit()
+        Job.query.update({Job.updated_at: updated_at},
+                         synchronize_session=False)
+        db.session.commit()
+        return job
+
+    def test_recompute_accepted(self):
+        """
+        Given a user's shapes, it should return status code 202, a Location to poll, and recompute every measure in chunks
+        """
+        response = self.client.post(
+            f'/api/users/{self.user_id}/recompute', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assertEqual(response.status_code, 202)
+        location = response.headers['Location']
+        self.assertTrue(location.endswith('/api/jobs/' + response.json['job_id']))
+        response = self.client.get(
+            location, headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert200(response)
+        self.assertEqual(response.json['state'], 'finished')
+        self.assertEqual(response.json['done'], 6)
+        self.assertEqual(response.json['total'], 6)
+        self.assert_recomputed()
+
+    def test_recompute_keeps_version(self):
+        """
+        Given a user's shapes, it should recompute their measures without changing their version
+        """
+        self.client.post(
+            f'/api/users/{self.user_id}/recompute', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert_recomputed()
+        self.assertEqual({rectangle.version for rectangle in Rectangle.query.all()}, {1})
+        self.assertEqual(Triangle.query.one().version, 1)
+
+    def test_recompute_fail_wrong_user(self):
+        """
+        Given user id that does not belong to user, it should return status code 403
+        """
+        response = self.client.post(
+            f'/api/users/{self.user_id + 1}/recompute', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert403(response)
+
+    def test_get_job_fail_wrong_user(self):
+        """
+        Given the job of another user, it should return status code 404
+        """
+        job_id = self.client.post(
+            f'/api/users/{self.user_id}/recompute', headers={"Authorization": "Bearer " + constants.TOKEN_VALID}).json['job_id']
+        response = self.client.get(
+            f'/api/jobs/{job_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID2})
+        self.assert404(response)
+
+    def test_resume_stopped_job(self):
+        """
+        Given a running job that stopped committing a lease ago, it should carry on from its cursor
+        """
+        first = Rectangle.query.order_by(Rectangle.rectangle_id).first()
+        self.add_job('running', datetime.utcnow() - timedelta(hours=1),
+                     cursor=json.dumps([0, first.rectangle_id]))
+        runner = JobRunner.from_config(self.app)
+        self.assertEqual(runner.resume(), 1)
+        job = Job.query.get('a' * 32)
+        db.session.refresh(job)
+        self.assertEqual(job.state, 'finished')
+        self.assertEqual(job.done, 5)
+        db.session.refresh(first)
+        # Committed before the stop, so not done again
+        self.assertEqual(first.area, 0)
+        self.assertEqual(first.version, 1)
+
+    def test_resume_skips_live_job(self):
+        """
+        Given a running job that committed within its lease, it should leave it to its runner
+        """
+        self.add_job('running', datetime.utcnow())
+        self.assertEqual(JobRunner.from_config(self.app).resume(), 0)
+
+    def test_thread_backend(self):
+        """
+        Given the thread backend, it should run the job on the pool
+        """
+        job = self.add_job('queued', datetime.utcnow())
+        runner = JobRunner(self.app, backend='thread', chunk_size=2)
+        runner.submit(job.job_id)
+        runner.shutdown()
+        db.session.refresh(job)
+        self.assertEqual(job.state, 'finished')
+        self.assert_recomputed()
+
+    def test_run_jobs_command(self):
+        """
+        Given a queued job, it should run it to the end
+        """
+        self.add_job('queued', datetime.utcnow())
+        result = self.app.test_cli_runner().invoke(args=['run-jobs'])
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue('1 jobs run' in result.output)
+        self.assert_recomputed()
+
+    def test_unknown_backend(self):
+        """
+        Given an unknown backend name, it should raise ValueError
+        """
+        with self.assertRaises(ValueError):
+            JobRunner(self.app, backend='celery')
@@ -0,0 +1,47 @@
+import unittest
+from flask import url_for
+from werkzeug.routing import IntegerConverter
+from app import create_app
+from app.links import link_templates
+
+
+class TestLinkTemplates(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('test')
+
+    def values(self, rule, text):
+        return {name: 42 if isinstance(converter, IntegerConverter) else text
+                for name, converter in rule._converters.items()}
+
+    def assert_same_links(self, base_url, text):
+        with self.app.test_request_context(base_url=base_url):
+            links = link_templates()
+            for rule in self.app.url_map.iter_rules():
+                if not rule.endpoint.startswith('api.'):
+                    continue
+                values = self.values(rule, text)
+                self.assertEqual(links.url_for(rule.endpoint, **values),
+                                 url_for(rule.endpoint, **values))
+
+    def test_same_as_url_for(self):
+        """
+        Given every api endpoint, it should build the same links as url_for
+        """
+        self.assert_same_links('http://localhost/', 'user_name')
+
+    def test_same_as_url_for_quoted(self):
+        """
+        Given values that need quoting and a script root, it should build the same links as url_for
+        """
+        self.assert_same_links('http://localhost/root/', 'jöhn d/oe?&{}')
+
+    def test_no_request_context(self):
+        """
+        Given no request context, it should fall back to url_for
+        """
+        self.app.config.update(SERVER_NAME='example.com')
+        with self.app.app_context():
+            self.assertEqual(
+                link_templates().url_for('api.get_user_by_user_id', user_id=1),
+                'http://example.com/api/users/1')
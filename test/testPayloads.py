@@ -0,0 +1,68 @@
+import unittest
+from datetime import datetime
+from flask import json
+from app import create_app
+from app.payloads import OrjsonJSON, StdlibJSON, create_provider, json_provider, orjson, respond
+
+# orjson is optional, so its provider is only tested where it is installed
+PROVIDERS = ['stdlib'] + (['orjson'] if orjson else [])
+
+
+class TestJSONProviders(unittest.TestCase):
+
+    def setUp(self):
+        self.providers = [StdlibJSON(json.JSONEncoder)]
+        if orjson:
+            self.providers.append(OrjsonJSON(json.JSONEncoder))
+
+    def test_same_output(self):
+        """
+        Given the same data, every provider should encode it to the same bytes
+        """
+        data = {'width': 2.5, 'length': 1, 'name': 'rectangle', 'created': datetime(2020, 1, 2, 3, 4, 5),
+                '_links': {'self': '/api/rectangles/1'}, 'items': [None, True, 0.1]}
+        encoded = set(provider.dumps(data) for provider in self.providers)
+        self.assertEqual(len(encoded), 1)
+        self.assertEqual(json.loads(encoded.pop())['created'],
+                         'Thu, 02 Jan 2020 03:04:05 GMT')
+
+    def test_reject_constants(self):
+        """
+        Given NaN or Infinity, every provider should refuse to decode it
+        """
+        for provider in self.providers:
+            for body in [b'{"length": NaN}', b'[Infinity]']:
+                with self.assertRaises(ValueError):
+                    provider.loads(body)
+
+    def test_unknown_provider(self):
+        """
+        Given an unknown provider name, it should raise ValueError
+        """
+        with self.assertRaises(ValueError):
+            create_provider('yaml')
+
+
+class TestJSONProviderConfig(unittest.TestCase):
+
+    def test_configured_provider(self):
+        """
+        Given JSON_PROVIDER, respond should use that provider
+        """
+        for name in PROVIDERS:
+            app = create_app('test')
+            app.config.update(JSON_PROVIDER=name)
+            with app.app_context():
+                self.assertEqual(json_provider().name, name)
+                response = respond({'b': 1, 'a': [1, 2]})
+                self.assertEqual(response.get_data(), b'{"a":[1,2],"b":1}\n')
+                self.assertEqual(response.mimetype, 'application/json')
+
+    def test_invalid_body(self):
+        """
+        Given a request body that is not valid JSON, it should return status code 400
+        """
+        app = create_app('test')
+        response = app.test_client().post(
+            '/api/users/register', data='{"user_name": NaN}', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
@@ -3,12 +3,18 @@ import os
 import json
 from flask import abort, url_for, jsonify
 from flask_testing import TestCase
+from sqlalchemy import event
 from dotenv import load_dotenv
 from app import create_app, db
 from app.models.rectangle import Rectangle
 from app.models.user import User
 import test.constants as constants
 import base64
+import gzip
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 
 class TestBaseRectangle(TestCase):
@@ -51,6 +57,40 @@ class TestBaseRectangle(TestCase):
 
 class TestCreateRectangle(TestBaseRectangle):
 
+    def test_create_shapes_single_statement(self):
+        """
+        Given any new shape, it should cost one INSERT besides looking up the token, and no SELECT of the new row
+        """
+        payloads = {
+            'rectangles': {"length": 1, "width": 2},
+            'squares': {"length": 1},
+            'triangles': {"length1": 3, "length2": 4, "length3": 5},
+            'diamonds': {"diagonal1": 1, "diagonal2": 2}
+        }
+        for plural, payload in payloads.items():
+            statements = []
+
+            def record(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            event.listen(db.engine, 'before_cursor_execute', record)
+            try:
+                response = self.client.post(
+                    f'/api/{plural}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=json.dumps(payload))
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record)
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.json['user_id'], self.user_id)
+            inserts = [statement for statement in statements
+                       if statement.startswith('INSERT')]
+            self.assertEqual(len(inserts), 1)
+            # Squares are stored as rectangles
+            self.assertTrue(inserts[0].startswith(
+                'INSERT INTO ' + plural.replace('squares', 'rectangles')))
+            # The token is looked up by the first request only, then cached
+            self.assertEqual(
+                len(statements) - 1, 1 if plural == 'rectangles' else 0)
+
     def test_create_rectangle_success(self):
         """
         Given proper credentials, it should return status code 201 and given credentials
@@ -70,6 +110,20 @@ class TestCreateRectangle(TestBaseRectangle):
         self.assertEqual(response.json['_links']['owner'],  url_for(
             'api.get_user_by_user_id', user_id=self.user_id))
 
+    def test_create_rectangle_same_as_get(self):
+        """
+        Given integer sides, it should return the rectangle as a later GET does
+        """
+        response = self.client.post(
+            '/api/rectangles', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=json.dumps({"length": 2, "width": 3}))
+        self.assertEqual(response.status_code, 201)
+        created = response.get_data()
+        response = self.client.get(
+            response.json['_links']['self'], headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert200(response)
+        self.assertEqual(response.get_data(), created)
+        self.assertEqual(response.json['length'], 2.0)
+
     def test_create_rectangle_fail_no_length(self):
         """
         Given no length, it should return status code 400 and proper error message
@@ -129,6 +183,59 @@ class TestCreateRectangle(TestBaseRectangle):
                          "length and width must be numbers")
 
 
+class TestCreateRectangleBatch(TestBaseRectangle):
+
+    def test_create_rectangle_batch_success(self):
+        """
+        Given a list of valid rectangles, it should return status code 201 and insert all of them
+        """
+        payload = json.dumps([{
+            "length": constants.NUMBER_VALID,
+            "width": constants.NUMBER_VALID2
+        }] * 3)
+
+        response = self.client.post(
+            '/api/rectangles/batch', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json['created'], 3)
+        self.assertEqual(Rectangle.query.filter_by(
+            user_id=self.user_id, width=constants.NUMBER_VALID2).count(), 3)
+
+    def test_create_rectangle_batch_fail_invalid_item(self):
+        """
+        Given a list with an invalid rectangle, it should return status code 400, per-item errors and insert nothing
+        """
+        payload = json.dumps([{
+            "length": constants.NUMBER_VALID,
+            "width": constants.NUMBER_VALID
+        }, {
+            "length": constants.NUMBER_NEGATIVE,
+            "width": constants.NUMBER_VALID
+        }])
+
+        response = self.client.post(
+            '/api/rectangles/batch', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assert400(response)
+        self.assertEqual(response.json['errors'], [
+                         {'index': 1, 'message': 'length and width must be positive'}])
+        self.assertEqual(Rectangle.query.count(), 0)
+
+    def test_create_rectangle_batch_fail_too_large(self):
+        """
+        Given more rectangles than MAX_BATCH_SIZE, it should return status code 400
+        """
+        self.app.config.update(MAX_BATCH_SIZE=2)
+        payload = json.dumps([{
+            "length": constants.NUMBER_VALID,
+            "width": constants.NUMBER_VALID
+        }] * 3)
+
+        response = self.client.post(
+            '/api/rectangles/batch', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assert400(response)
+        self.assertEqual(Rectangle.query.count(), 0)
+
+
 class TestRectangle(TestCase):
     """ Base class to insert test rectangle into database """
 
@@ -210,6 +317,388 @@ class TestGetRectangle(TestRectangle):
         self.assertEqual(response.json['Perimeter'], perimeter)
 
 
+class TestConditionalRectangle(TestRectangle):
+
+    def test_get_rectangle_not_modified(self):
+        """
+        Given the ETag of the current rectangle in If-None-Match, it should return status code 304 without a body
+        """
+        response = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        etag = response.headers['ETag']
+        response = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertTrue('Accept-Encoding' in response.headers['Vary'])
+
+    def test_get_rectangle_sparse_etag(self):
+        """
+        Given the ETag of a sparse rectangle in If-None-Match, it should return status code 304 only for the same fields and links
+        """
+        headers = {"Authorization": "Bearer " + constants.TOKEN_VALID}
+        full = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}', headers=headers).headers['ETag']
+        etag = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}?fields=width,length&links=false', headers=headers).headers['ETag']
+        self.assertNotEqual(etag, full)
+        response = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}?fields=length,width&links=false', headers=dict(headers, **{"If-None-Match": etag}))
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}', headers=dict(headers, **{"If-None-Match": etag}))
+        self.assert200(response)
+        response = self.client.put(
+            f'/api/rectangles/{self.rectangle_id}', headers=dict(headers, **{"Content-Type": "application/json", "If-Match": etag}), data=json.dumps({"length": 2}))
+        self.assert200(response)
+
+    def test_get_rectangle_other_coding_modified(self):
+        """
+        Given the ETag of a gzip response in If-None-Match and no Accept-Encoding, it should return status code 200
+        """
+        self.app.config.update(COMPRESS_MIN_SIZE=0)
+        etag = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Accept-Encoding": "gzip"}).headers['ETag']
+        response = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "If-None-Match": etag})
+        self.assert200(response)
+        self.assertFalse('Content-Encoding' in response.headers)
+
+    def test_get_rectangle_area_modified(self):
+        """
+        Given an ETag from before an update in If-None-Match, it should return status code 200 and the new area
+        """
+        response = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}/area', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        etag = response.headers['ETag']
+        self.client.put(
+            f'/api/rectangles/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=json.dumps({"length": 2}))
+        response = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}/area', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "If-None-Match": etag})
+        self.assert200(response)
+        self.assertEqual(response.json['Area'], 2 * constants.NUMBER_VALID)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_update_rectangle_if_match(self):
+        """
+        Given the current ETag in If-Match, it should update the rectangle and return its new ETag
+        """
+        etag = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID}).headers['ETag']
+        response = self.client.put(
+            f'/api/rectangles/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json", "If-Match": etag}, data=json.dumps({"length": 2}))
+        self.assert200(response)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_update_rectangle_fail_stale_if_match(self):
+        """
+        Given an outdated ETag in If-Match, it should return status code 412 and leave the rectangle unchanged
+        """
+        etag = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID}).headers['ETag']
+        self.client.put(
+            f'/api/rectangles/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=json.dumps({"length": 2}))
+        response = self.client.put(
+            f'/api/rectangles/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json", "If-Match": etag}, data=json.dumps({"length": 3}))
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(response.json['message'],
+                         'resource has been modified')
+        self.assertEqual(Rectangle.query.get(self.rectangle_id).length, 2)
+
+    def test_update_rectangle_single_statement(self):
+        """
+        Given an update, it should write the rectangle with one UPDATE without selecting it first
+        """
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        # Authenticate first, so that only the update itself is recorded
+        self.client.get(
+            f'/api/users/{self.user_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = self.client.put(
+                f'/api/rectangles/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=json.dumps({"length": 2}))
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        self.assert200(response)
+        self.assertEqual(response.json['length'], 2)
+        self.assertTrue(statements[0].startswith('UPDATE rectangles'))
+        self.assertEqual(
+            len([statement for statement in statements if statement.startswith('UPDATE')]), 1)
+
+    def test_update_rectangle_unchanged(self):
+        """
+        Given the values the rectangle already has, it should return it without bumping its version
+        """
+        etag = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID}).headers['ETag']
+        response = self.client.put(
+            f'/api/rectangles/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json", "If-Match": etag}, data=json.dumps({"length": constants.NUMBER_VALID, "width": constants.NUMBER_VALID}))
+        self.assert200(response)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(Rectangle.query.get(self.rectangle_id).version, 1)
+
+    def test_update_rectangle_not_found(self):
+        """
+        Given the id of a rectangle that does not exist, it should return status code 404
+        """
+        response = self.client.put(
+            f'/api/rectangles/{self.rectangle_id + 1}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=json.dumps({"length": 2}))
+        self.assert404(response)
+
+
+class TestCompressedRectangle(TestRectangle):
+
+    def test_get_rectangles_compressed(self):
+        """
+        Given Accept-Encoding gzip and a response larger than COMPRESS_MIN_SIZE, it should return it gzip compressed
+        """
+        self.app.config.update(COMPRESS_MIN_SIZE=100)
+        response = self.client.get(
+            '/api/rectangles', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Accept-Encoding": "gzip"})
+        self.assert200(response)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertTrue('Accept-Encoding' in response.headers['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(response.data))[
+                         'items'][0]['rectangle_id'], self.rectangle_id)
+
+    def test_get_rectangle_below_min_size(self):
+        """
+        Given a response smaller than COMPRESS_MIN_SIZE, it should return it uncompressed
+        """
+        response = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Accept-Encoding": "gzip"})
+        self.assert200(response)
+        self.assertFalse('Content-Encoding' in response.headers)
+        self.assertEqual(response.json['rectangle_id'], self.rectangle_id)
+
+    def test_get_rectangle_compressed_not_modified(self):
+        """
+        Given the ETag of a compressed response in If-None-Match, it should return status code 304 with that ETag
+        """
+        self.app.config.update(COMPRESS_MIN_SIZE=0)
+        headers = {"Authorization": "Bearer " + constants.TOKEN_VALID,
+                   "Accept-Encoding": "gzip"}
+        etag = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}', headers=headers).headers['ETag']
+        self.assertTrue(etag.endswith('-gzip"'))
+        response = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}', headers=dict(headers, **{"If-None-Match": etag}))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+
+
+@unittest.skipUnless(msgpack, 'msgpack is not installed')
+class TestMessagePackRectangle(TestRectangle):
+
+    def test_create_rectangle_msgpack(self):
+        """
+        Given a MessagePack body and Accept, it should return status code 201 and the rectangle as MessagePack
+        """
+        response = self.client.post(
+            '/api/rectangles', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/msgpack", "Accept": "application/msgpack"},
+            data=msgpack.packb({"length": constants.NUMBER_VALID, "width": constants.NUMBER_VALID2}))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.headers['Content-Type'], 'application/msgpack')
+        rectangle = msgpack.unpackb(response.data)
+        self.assertEqual(rectangle['length'], constants.NUMBER_VALID)
+        self.assertEqual(rectangle['width'], constants.NUMBER_VALID2)
+        self.assertEqual(rectangle['_links']['owner'], url_for(
+            'api.get_user_by_user_id', user_id=self.user_id))
+
+    def test_update_rectangle_msgpack_round_trip(self):
+        """
+        Given a rectangle read as MessagePack and sent back changed, it should return status code 200 and the same fields as JSON
+        """
+        headers = {"Authorization": "Bearer " + constants.TOKEN_VALID,
+                   "Accept": "application/msgpack"}
+        response = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}', headers=headers)
+        self.assert200(response)
+        self.assertTrue(response.headers['ETag'].endswith('-msgpack"'))
+        rectangle = msgpack.unpackb(response.data)
+        self.assertEqual(rectangle, self.client.get(
+            f'/api/rectangles/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID}).json)
+        rectangle['length'] = constants.NUMBER_VALID2
+        response = self.client.put(
+            f'/api/rectangles/{self.rectangle_id}', headers=dict(headers, **{"Content-Type": "application/msgpack", "If-Match": response.headers['ETag']}),
+            data=msgpack.packb(rectangle))
+        self.assert200(response)
+        self.assertEqual(msgpack.unpackb(response.data)[
+                         'length'], constants.NUMBER_VALID2)
+
+    def test_get_rectangle_msgpack_not_modified(self):
+        """
+        Given the ETag of a MessagePack response in If-None-Match, it should return status code 304 only to a request for MessagePack
+        """
+        headers = {"Authorization": "Bearer " + constants.TOKEN_VALID,
+                   "Accept": "application/msgpack"}
+        etag = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}', headers=headers).headers['ETag']
+        response = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}', headers=dict(headers, **{"If-None-Match": etag}))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertTrue('Accept' in response.headers['Vary'])
+        response = self.client.get(
+            f'/api/rectangles/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "If-None-Match": etag})
+        self.assert200(response)
+        self.assertEqual(response.json['rectangle_id'], self.rectangle_id)
+
+    def test_create_rectangle_fail_msgpack_infinity(self):
+        """
+        Given a MessagePack body with an infinite length, it should return status code 400
+        """
+        response = self.client.post(
+            '/api/rectangles', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/msgpack"},
+            data=msgpack.packb({"length": float('inf'), "width": constants.NUMBER_VALID}))
+        self.assert400(response)
+
+    def test_error_msgpack(self):
+        """
+        Given Accept MessagePack and an invalid request, it should return the error as MessagePack
+        """
+        response = self.client.post(
+            '/api/rectangles', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/msgpack", "Accept": "application/msgpack"},
+            data=msgpack.packb({"length": constants.NUMBER_VALID}))
+        self.assert400(response)
+        self.assertEqual(msgpack.unpackb(response.data)['message'],
+                         'must include length and width fields')
+
+
+class TestListRectangles(TestRectangle):
+
+    def setUp(self):
+        super().setUp()
+        for _ in range(4):
+            db.session.add(Rectangle(
+                user_id=self.user_id, length=constants.NUMBER_VALID, width=constants.NUMBER_VALID2))
+        other = User(user_name=constants.USER_NAME2,
+                     password=constants.PASSWORD_STRONG)
+        db.session.add(other)
+        db.session.commit()
+        db.session.add(Rectangle(
+            user_id=other.user_id, length=constants.NUMBER_VALID, width=constants.NUMBER_VALID))
+        db.session.commit()
+
+    def test_list_rectangles_success(self):
+        """
+        Given a limit, it should return pages of the user's rectangles linked by a cursor
+        """
+        ids = []
+        url = '/api/rectangles?limit=2'
+        while url:
+            response = self.client.get(
+                url, headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+            self.assert200(response)
+            self.assertTrue(len(response.json['items']) <= 2)
+            ids += [item['rectangle_id'] for item in response.json['items']]
+            url = response.json['_links']['next']
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(ids[0], self.rectangle_id)
+
+    def test_list_rectangles_fail_invalid_cursor(self):
+        """
+        Given a cursor that was not issued by the API, it should return status code 400 and proper error message
+        """
+        response = self.client.get(
+            '/api/rectangles?cursor=notacursor', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert400(response)
+        self.assertEqual(response.json['message'], 'invalid cursor')
+
+    def test_list_rectangles_fail_invalid_limit(self):
+        """
+        Given a non-positive limit, it should return status code 400 and proper error message
+        """
+        response = self.client.get(
+            '/api/rectangles?limit=0', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert400(response)
+        self.assertEqual(response.json['message'],
+                         'limit must be a positive integer')
+
+    def test_list_rectangles_sparse_fieldset(self):
+        """
+        Given fields and links=false, it should return pages of only those fields and carry them over to the next page
+        """
+        response = self.client.get(
+            '/api/rectangles?limit=2&fields=length&links=false', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert200(response)
+        self.assertEqual(response.json['items'][0],
+                         {"length": constants.NUMBER_VALID})
+        next_url = response.json['_links']['next']
+        self.assertTrue('fields=length' in next_url)
+        self.assertTrue('links=false' in next_url)
+
+    def test_list_rectangles_fail_invalid_fields(self):
+        """
+        Given a field rectangles do not have, it should return status code 400 and proper error message
+        """
+        response = self.client.get(
+            '/api/rectangles?fields=radius', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert400(response)
+        self.assertEqual(response.json['message'],
+                         'fields must be some of rectangle_id, user_id, length, width')
+
+
+class TestRectanglesInRange(TestRectangle):
+
+    def setUp(self):
+        super().setUp()
+        for length in [1, 2, 4, 8]:
+            db.session.add(Rectangle(
+                user_id=self.user_id, length=length, width=1))
+        db.session.commit()
+
+    def test_rectangles_in_range_success(self):
+        """
+        Given area bounds and a limit, it should return pages of the rectangles in range ordered by area
+        """
+        areas = []
+        url = '/api/rectangles/range?min=2&max=12.25&limit=2'
+        while url:
+            response = self.client.get(
+                url, headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+            self.assert200(response)
+            areas += [item['length'] * item['width']
+                      for item in response.json['items']]
+            url = response.json['_links']['next']
+        self.assertEqual(areas, [2, 4, 8, 12.25])
+
+    def test_rectangles_in_range_by_perimeter(self):
+        """
+        Given by=perimeter and a lower bound, it should return the rectangles ordered by perimeter
+        """
+        response = self.client.get(
+            '/api/rectangles/range?by=perimeter&min=14', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert200(response)
+        self.assertEqual([item['length'] for item in response.json['items']],
+                         [constants.NUMBER_VALID, 8])
+
+    def test_rectangles_in_range_fail_invalid_bound(self):
+        """
+        Given a bound that is not a number, it should return status code 400 and proper error message
+        """
+        response = self.client.get(
+            '/api/rectangles/range?max=big', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert400(response)
+        self.assertEqual(response.json['message'], 'max must be a number')
+
+    def test_rectangles_in_range_fail_invalid_measure(self):
+        """
+        Given an unknown measure, it should return status code 400 and proper error message
+        """
+        response = self.client.get(
+            '/api/rectangles/range?by=volume', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert400(response)
+        self.assertEqual(response.json['message'],
+                         'by must be area or perimeter')
+
+
 class TestUpdateRectangle(TestRectangle):
     def test_update_rectangle_success(self):
         """
@@ -227,6 +716,8 @@ class TestUpdateRectangle(TestRectangle):
         self.assertEqual(response.json['width'], constants.NUMBER_VALID)
         self.assertEqual(response.json['_links']['owner'],  url_for(
             'api.get_user_by_user_id', user_id=self.user_id))
+        self.assertEqual(Rectangle.query.get(self.rectangle_id).area,
+                         constants.NUMBER_VALID2 * constants.NUMBER_VALID)
 
     def test_update_rectangle_fail_negative_length(self):
         """
@@ -265,3 +756,101 @@ class TestDeleteRectangle(TestRectangle):
         response = self.client.delete(
             f'/api/rectangles/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
         self.assertEqual(response.status_code, 204)
+
+
+class TestBulkRectangles(TestRectangle):
+
+    def setUp(self):
+        super().setUp()
+        rectangle = Rectangle(
+            user_id=self.user_id, length=constants.NUMBER_VALID2, width=constants.NUMBER_VALID2)
+        db.session.add(rectangle)
+        db.session.commit()
+        self.rectangle_id2 = rectangle.rectangle_id
+
+    def test_bulk_update_rectangles_filter_success(self):
+        """
+        Given a filter and new values, it should return status code 200 and update only the matching rectangles
+        """
+        payload = json.dumps({
+            "filter": {"width": {"lt": constants.NUMBER_VALID2}},
+            "set": {"length": constants.NUMBER_VALID2}
+        })
+        response = self.client.patch(
+            '/api/rectangles', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assert200(response)
+        self.assertEqual(response.json['updated'], 1)
+        self.assertEqual(Rectangle.query.get(
+            self.rectangle_id).length, constants.NUMBER_VALID2)
+
+    def test_bulk_update_rectangles_scale_success(self):
+        """
+        Given ids and a scale factor, it should multiply the dimensions in the database
+        """
+        payload = json.dumps({
+            "ids": [self.rectangle_id, self.rectangle_id2],
+            "scale": {"width": 2}
+        })
+        response = self.client.patch(
+            '/api/rectangles', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assert200(response)
+        self.assertEqual(response.json['updated'], 2)
+        self.assertEqual(Rectangle.query.get(
+            self.rectangle_id).width, constants.NUMBER_VALID * 2)
+        self.assertEqual(Rectangle.query.get(
+            self.rectangle_id2).width, constants.NUMBER_VALID2 * 2)
+
+    def test_bulk_update_rectangles_updates_measures(self):
+        """
+        Given new values and a scale factor, it should store the area and perimeter of the new dimensions
+        """
+        payload = json.dumps({
+            "ids": [self.rectangle_id],
+            "set": {"length": constants.NUMBER_VALID2},
+            "scale": {"width": 2}
+        })
+        response = self.client.patch(
+            '/api/rectangles', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assert200(response)
+        rectangle = Rectangle.query.get(self.rectangle_id)
+        self.assertEqual(rectangle.area,
+                         constants.NUMBER_VALID2 * constants.NUMBER_VALID * 2)
+        self.assertEqual(rectangle.perimeter,
+                         (constants.NUMBER_VALID2 + constants.NUMBER_VALID * 2) * 2)
+
+    def test_bulk_update_rectangles_fail_negative_value(self):
+        """
+        Given a negative value, it should return status code 400 and proper error message
+        """
+        payload = json.dumps({
+            "ids": [self.rectangle_id],
+            "set": {"length": constants.NUMBER_NEGATIVE}
+        })
+        response = self.client.patch(
+            '/api/rectangles', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assert400(response)
+        self.assertEqual(response.json['message'],
+                         'length must be a positive number')
+
+    def test_bulk_update_rectangles_fail_no_selection(self):
+        """
+        Given neither ids nor filter, it should return status code 400 and proper error message
+        """
+        payload = json.dumps({"set": {"length": constants.NUMBER_VALID}})
+        response = self.client.patch(
+            '/api/rectangles', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assert400(response)
+        self.assertEqual(response.json['message'],
+                         'must include either ids or filter')
+
+    def test_bulk_delete_rectangles_success(self):
+        """
+        Given ids, it should return status code 200 and the number of deleted rectangles
+        """
+        payload = json.dumps({"ids": [self.rectangle_id]})
+        response = self.client.delete(
+            '/api/rectangles', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assert200(response)
+        self.assertEqual(response.json['deleted'], 1)
+        self.assertIsNone(Rectangle.query.get(self.rectangle_id))
+        self.assertIsNotNone(Rectangle.query.get(self.rectangle_id2))
@@ -5,6 +5,7 @@ from flask import abort, url_for, jsonify
 from flask_testing import TestCase
 from dotenv import load_dotenv
 from app import create_app, db
+from app.models.rectangle import Rectangle
 from app.models.square import Square
 from app.models.user import User
 import test.constants as constants
@@ -190,6 +191,127 @@ class TestGetSquare(TestSquare):
         self.assertEqual(response.json['Perimeter'], perimeter)
 
 
+class TestListSquares(TestSquare):
+
+    def test_list_squares_success(self):
+        """
+        Given squares and other rectangles, it should only list the squares
+        """
+        db.session.add(Rectangle(user_id=self.user_id,
+                                 length=constants.NUMBER_VALID, width=constants.NUMBER_VALID2))
+        db.session.commit()
+        response = self.client.get(
+            '/api/squares', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert200(response)
+        self.assertEqual([item['square_id'] for item in response.json['items']], [
+                         self.rectangle_id])
+        self.assertIsNone(response.json['next'])
+
+    def test_get_square_fail_not_a_square(self):
+        """
+        Given the id of a rectangle whose sides differ, it should return status code 404
+        """
+        rectangle = Rectangle(user_id=self.user_id,
+                              length=constants.NUMBER_VALID, width=constants.NUMBER_VALID2)
+        db.session.add(rectangle)
+        db.session.commit()
+        response = self.client.get(
+            f'/api/squares/{rectangle.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert404(response)
+
+
+class TestSquareShapeType(TestSquare):
+
+    def test_rectangle_becomes_square(self):
+        """
+        Given a rectangle updated to equal sides, it should be listed as a square
+        """
+        rectangle = Rectangle(user_id=self.user_id,
+                              length=constants.NUMBER_VALID, width=constants.NUMBER_VALID2)
+        db.session.add(rectangle)
+        db.session.commit()
+        rectangle_id = rectangle.rectangle_id
+        self.assertEqual(rectangle.shape_type, 'rectangle')
+        response = self.client.put(
+            f'/api/rectangles/{rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=json.dumps({"width": constants.NUMBER_VALID}))
+        self.assert200(response)
+        self.assertEqual(response.json['rectangle_id'], rectangle_id)
+        response = self.client.get(
+            '/api/squares', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assertEqual([item['square_id'] for item in response.json['items']], [
+                         self.rectangle_id, rectangle_id])
+
+    def test_square_updated_as_rectangle(self):
+        """
+        Given a square updated to different sides as a rectangle, it should return status code 200 and no longer be a square
+        """
+        response = self.client.put(
+            f'/api/rectangles/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=json.dumps({"width": constants.NUMBER_VALID2}))
+        self.assert200(response)
+        self.assertEqual(response.json['length'], constants.NUMBER_VALID)
+        self.assertEqual(response.json['width'], constants.NUMBER_VALID2)
+        db.session.expire_all()
+        self.assertEqual(type(Rectangle.query.get(self.rectangle_id)), Rectangle)
+        self.assert404(self.client.get(
+            f'/api/squares/{self.rectangle_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID}))
+
+    def test_bulk_update_rectangles_shape_type(self):
+        """
+        Given a bulk update that makes sides differ, it should turn the squares into rectangles
+        """
+        response = self.client.patch(
+            '/api/rectangles', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"},
+            data=json.dumps({"ids": [self.rectangle_id], "scale": {"width": 2}}))
+        self.assert200(response)
+        db.session.expire_all()
+        self.assertEqual(Rectangle.query.get(
+            self.rectangle_id).shape_type, 'rectangle')
+
+    def test_create_rectangles_batch_shape_type(self):
+        """
+        Given a batch of rectangles, it should store those with equal sides as squares
+        """
+        response = self.client.post(
+            '/api/rectangles/batch', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"},
+            data=json.dumps([{"length": 2, "width": 2}, {"length": 2, "width": 3}]))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Square.query.count(), 2)
+        self.assertEqual(Rectangle.query.count(), 3)
+
+
+class TestBulkSquares(TestSquare):
+
+    def test_bulk_update_squares_scale_success(self):
+        """
+        Given a scale factor for length, it should scale both sides and keep the measures in step
+        """
+        payload = json.dumps({
+            "ids": [self.rectangle_id],
+            "scale": {"length": 2}
+        })
+        response = self.client.patch(
+            '/api/squares', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assert200(response)
+        self.assertEqual(response.json['updated'], 1)
+        square = Square.query.get(self.rectangle_id)
+        self.assertEqual(square.length, constants.NUMBER_VALID * 2)
+        self.assertEqual(square.width, constants.NUMBER_VALID * 2)
+        self.assertEqual(square.perimeter, constants.NUMBER_VALID * 8)
+
+    def test_bulk_update_squares_fail_width(self):
+        """
+        Given width, which squares do not have, it should return status code 400 and proper error message
+        """
+        payload = json.dumps({
+            "ids": [self.rectangle_id],
+            "set": {"width": 2}
+        })
+        response = self.client.patch(
+            '/api/squares', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assert400(response)
+        self.assertEqual(response.json['message'], 'cannot set width')
+
+
 class TestUpdateSquare(TestSquare):
     def test_update_square_success(self):
         """
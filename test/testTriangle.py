@@ -120,6 +120,60 @@ class TestCreateTriangle(TestBaseTriangle):
                          "length must be numbers")
 
 
+class TestCreateTriangleBatch(TestBaseTriangle):
+
+    def test_create_triangle_batch_success(self):
+        """
+        Given a list of valid triangles, it should return status code 201 and insert all of them
+        """
+        payload = json.dumps([{
+            "length1": constants.NUMBER_VALID,
+            "length2": constants.NUMBER_VALID,
+            "length3": constants.NUMBER_VALID
+        }] * 2)
+
+        response = self.client.post(
+            '/api/triangles/batch', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json['created'], 2)
+        self.assertEqual(Triangle.query.filter_by(
+            user_id=self.user_id).count(), 2)
+        self.assertEqual(Triangle.query.filter_by(
+            user_id=self.user_id).first().perimeter, constants.NUMBER_VALID * 3)
+
+    def test_create_triangle_batch_impossible_sides(self):
+        """
+        Given sides that cannot make a triangle, it should store no area
+        """
+        payload = json.dumps([{
+            "length1": constants.NUMBER_VALID,
+            "length2": constants.NUMBER_VALID,
+            "length3": constants.NUMBER_VALID * 3
+        }])
+
+        response = self.client.post(
+            '/api/triangles/batch', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNone(Triangle.query.filter_by(
+            user_id=self.user_id).first().area)
+
+    def test_create_triangle_batch_fail_not_a_list(self):
+        """
+        Given a single triangle instead of a list, it should return status code 400 and proper error message
+        """
+        payload = json.dumps({
+            "length1": constants.NUMBER_VALID,
+            "length2": constants.NUMBER_VALID,
+            "length3": constants.NUMBER_VALID
+        })
+
+        response = self.client.post(
+            '/api/triangles/batch', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json"}, data=payload)
+        self.assert400(response)
+        self.assertEqual(response.json['message'],
+                         'must be a non-empty list of triangles')
+
+
 class TestTriangle(TestCase):
     """ Base class to insert test triangle into database """
 
@@ -254,6 +308,24 @@ class TestUpdateTriangle(TestTriangle):
                          "length must be numbers")
 
 
+class TestTriangleStats(TestTriangle):
+
+    def test_user_stats_impossible_triangle(self):
+        """
+        Given a triangle whose sides cannot make one, it should count it but leave it out of the area aggregates
+        """
+        db.session.add_all([Triangle(1, 1, 5, user_id=self.user_id),
+                            Triangle(3, 4, 5, user_id=self.user_id)])
+        db.session.commit()
+        response = self.client.get(
+            f'/api/users/{self.user_id}/stats', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert200(response)
+        triangles = response.json['triangles']
+        self.assertEqual(triangles['count'], 3)
+        self.assertEqual(triangles['area']['max'], 6.0)
+        self.assertEqual(triangles['perimeter']['min'], 7.0)
+
+
 class TestDeleteTriangle(TestTriangle):
     def test_delete_triangle_success(self):
         """
@@ -3,11 +3,17 @@ import os
 import json
 from flask import abort, url_for, jsonify
 from flask_testing import TestCase
+from sqlalchemy import event
 from dotenv import load_dotenv
 from app import create_app, db
+from app.models.diamond import Diamond
+from app.models.rectangle import Rectangle
+from app.models.triangle import Triangle
 from app.models.user import User
 import test.constants as constants
 import base64
+import gzip
+from datetime import datetime, timedelta
 
 
 class TestBase(TestCase):
@@ -183,6 +189,33 @@ class TestCreateUser(TestBase):
                          "please enter a valid email address")
 
 
+class TestCreateUserStatements(TestBase):
+
+    def test_create_user_no_select_after_insert(self):
+        """
+        Given a new user, it should respond from the INSERT without selecting the new row
+        """
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = self.client.post(
+                '/api/users/register', headers={"Content-Type": "application/json"}, data=json.dumps({
+                    "user_name": constants.USER_NAME2,
+                    "password": constants.PASSWORD_STRONG
+                }))
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json['user_name'], constants.USER_NAME2)
+        # Only the check that the name is free comes before the INSERT
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(statements[-1].startswith('INSERT INTO users'))
+
+
 class TestUserLogin(TestBase):
     def setUp(self):
         """
@@ -307,6 +340,69 @@ class TestGetUser(TestUser):
         self.assertEqual(response.json['error'], 'Unauthorized')
 
 
+class TestConditionalUser(TestUser):
+
+    def test_get_user_not_modified(self):
+        """
+        Given the ETag of the current user in If-None-Match, it should return status code 304
+        """
+        etag = self.client.get(
+            f'/api/users/{self.user_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID}).headers['ETag']
+        response = self.client.get(
+            f'/api/users/{constants.USER_NAME}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_update_user_fail_stale_if_match(self):
+        """
+        Given an ETag from before another update in If-Match, it should return status code 412
+        """
+        etag = self.client.get(
+            f'/api/users/{self.user_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID}).headers['ETag']
+        response = self.client.put(
+            f'/api/users/{self.user_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json", "If-Match": etag}, data=json.dumps({"first_name": constants.FIRST_NAME2}))
+        self.assert200(response)
+        response = self.client.put(
+            f'/api/users/{self.user_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json", "If-Match": etag}, data=json.dumps({"last_name": constants.LAST_NAME2}))
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(User.query.get(self.user_id).last_name,
+                         constants.LAST_NAME)
+
+    def test_update_user_unchanged(self):
+        """
+        Given the names the user already has, it should return status code 200 and the same ETag
+        """
+        etag = self.client.get(
+            f'/api/users/{self.user_id}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID}).headers['ETag']
+        response = self.client.put(
+            f'/api/users/{constants.USER_NAME}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Content-Type": "application/json", "If-Match": etag}, data=json.dumps({"first_name": constants.FIRST_NAME, "last_name": constants.LAST_NAME}))
+        self.assert200(response)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.json['first_name'], constants.FIRST_NAME)
+
+
+class TestSparseUser(TestUser):
+
+    def test_get_user_sparse_fieldset(self):
+        """
+        Given fields and links=false, it should return status code 200 and only those fields
+        """
+        response = self.client.get(
+            f'/api/users/{self.user_id}?fields=user_name,email&links=false', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert200(response)
+        self.assertEqual(response.json, {
+            "user_name": constants.USER_NAME, "email": constants.EMAIL_VALID})
+
+    def test_get_user_fail_invalid_links(self):
+        """
+        Given links that is neither true nor false, it should return status code 400 and proper error message
+        """
+        response = self.client.get(
+            f'/api/users/{self.user_id}?links=maybe', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert400(response)
+        self.assertEqual(response.json['message'],
+                         'links must be true or false')
+
+
 class TestUpdateUser(TestUser):
     def test_update_user_success(self):
         """
@@ -406,3 +502,318 @@ class TestDeleteUser(TestUser):
         response = self.client.delete(
             f'/api/users/{self.user_id + 1}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
         self.assert403(response)
+
+    def test_delete_user_cascades_in_database(self):
+        """
+        Given a user with shapes, it should delete the user and the shapes with a single DELETE
+        """
+        db.session.add_all([Rectangle(1, 2, user_id=self.user_id) for _ in range(3)]
+                           + [Triangle(3, 4, 5, user_id=self.user_id),
+                              Diamond(1, 2, user_id=self.user_id)])
+        db.session.commit()
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = self.client.delete(
+                f'/api/users/{constants.USER_NAME}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        self.assertEqual(response.status_code, 204)
+        deletes = [statement for statement in statements
+                   if statement.startswith('DELETE')]
+        self.assertEqual(len(deletes), 1)
+        self.assertTrue(deletes[0].startswith('DELETE FROM users'))
+        for model in (Rectangle, Triangle, Diamond):
+            self.assertEqual(model.query.count(), 0)
+
+
+class TestUserStats(TestUser):
+
+    def test_user_stats_success(self):
+        """
+        Given a user with shapes, it should return status code 200 and aggregates per shape type
+        """
+        db.session.add(Rectangle(user_id=self.user_id,
+                                 length=constants.NUMBER_VALID, width=constants.NUMBER_VALID2))
+        db.session.add(Rectangle(user_id=self.user_id,
+                                 length=constants.NUMBER_VALID, width=constants.NUMBER_VALID))
+        db.session.add(Triangle(user_id=self.user_id,
+                                length1=3, length2=4, length3=5))
+        db.session.commit()
+        response = self.client.get(
+            f'/api/users/{self.user_id}/stats', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert200(response)
+        rectangles = response.json['rectangles']
+        self.assertEqual(rectangles['count'], 2)
+        self.assertEqual(rectangles['area']['sum'], constants.NUMBER_VALID *
+                         constants.NUMBER_VALID2 + constants.NUMBER_VALID * constants.NUMBER_VALID)
+        self.assertEqual(rectangles['perimeter']['max'],
+                         (constants.NUMBER_VALID + constants.NUMBER_VALID2) * 2)
+        squares = response.json['squares']
+        self.assertEqual(squares['count'], 1)
+        self.assertEqual(squares['area']['mean'],
+                         constants.NUMBER_VALID * constants.NUMBER_VALID)
+        self.assertEqual(response.json['triangles']['area']['sum'], 6.0)
+        self.assertEqual(response.json['diamonds']['count'], 0)
+        self.assertIsNone(response.json['diamonds']['area']['sum'])
+
+    def test_user_stats_fail_wrong_user(self):
+        """
+        Given user id that does not belong to user, it should return status code 403
+        """
+        response = self.client.get(
+            f'/api/users/{self.user_id + 1}/stats', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert403(response)
+
+
+class TestUserImport(TestUser):
+
+    def setUp(self):
+        super().setUp()
+        self.app.config.update(IMPORT_CHUNK_SIZE=2)
+
+    def import_lines(self, lines, query='', headers={}):
+        return self.client.post(
+            f'/api/users/{self.user_id}/import{query}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, **headers}, data=lines)
+
+    def test_import_success(self):
+        """
+        Given NDJSON shapes, it should insert all of them in chunks and return a finished checkpoint
+        """
+        lines = '\n'.join([
+            json.dumps({"shape": "rectangle", "length": 2, "width": 3}),
+            json.dumps({"shape": "square", "length": 2}),
+            '',
+            json.dumps({"shape": "triangle", "length1": 1, "length2": 1, "length3": 5}),
+            json.dumps({"shape": "diamond", "diagonal1": 6, "diagonal2": 8})
+        ])
+        response = self.import_lines(lines)
+        self.assert200(response)
+        self.assertEqual(response.json['created'], 4)
+        self.assertEqual(response.json['lines'], 5)
+        self.assertTrue(response.json['finished'])
+        self.assertEqual(Rectangle.query.filter_by(
+            user_id=self.user_id, length=2, width=2).one().area, 4)
+        self.assertIsNone(Triangle.query.filter_by(
+            user_id=self.user_id).one().area)
+        self.assertEqual(Diamond.query.filter_by(
+            user_id=self.user_id).one().perimeter, 20)
+
+    def test_import_resume(self):
+        """
+        Given an import stopped by an invalid shape, it should keep the committed chunks and resume after them
+        """
+        lines = [json.dumps({"shape": "rectangle", "length": 2, "width": 3})] * 2
+        lines.append(json.dumps(
+            {"shape": "rectangle", "length": -2, "width": 3}))
+        response = self.import_lines(
+            '\n'.join(lines), query='?import_id=nightly')
+        self.assert400(response)
+        self.assertEqual(response.json['errors'], [
+                         {'line': 3, 'message': 'length and width must be positive'}])
+        response = self.client.get(
+            response.headers['Location'], headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assertEqual(response.json['lines'], 2)
+        self.assertFalse(response.json['finished'])
+        lines[2] = json.dumps({"shape": "rectangle", "length": 2, "width": 3})
+        response = self.import_lines(
+            '\n'.join(lines), query='?import_id=nightly')
+        self.assert200(response)
+        self.assertEqual(response.json['created'], 3)
+        self.assertEqual(Rectangle.query.filter_by(
+            user_id=self.user_id, length=2).count(), 3)
+
+    def test_import_gzip(self):
+        """
+        Given a gzip compressed body, it should decompress it while reading
+        """
+        lines = json.dumps({"shape": "square", "length": 2}) + '\n'
+        response = self.import_lines(gzip.compress(
+            lines.encode('utf-8')), headers={"Content-Encoding": "gzip"})
+        self.assert200(response)
+        self.assertEqual(response.json['created'], 1)
+
+    def test_import_fail_unknown_shape(self):
+        """
+        Given a line with an unknown shape, it should return status code 400 and the line number
+        """
+        response = self.import_lines(json.dumps({"shape": "circle"}))
+        self.assert400(response)
+        self.assertEqual(response.json['errors'][0]['line'], 1)
+
+    def test_import_fail_unhashable_shape(self):
+        """
+        Given a line whose shape is a list, it should return status code 400 and the line's error
+        """
+        response = self.import_lines(json.dumps({"shape": [1]}))
+        self.assert400(response)
+        self.assertEqual(response.json['errors'], [
+                         {'line': 1, 'message': 'shape must be one of rectangle, square, triangle, diamond'}])
+
+    def test_import_fail_too_large(self):
+        """
+        Given a dimension too large for a float, it should return status code 400 and the line's error
+        """
+        self.app.config.update(JSON_PROVIDER='stdlib')
+        self.app.extensions.pop('json_provider', None)
+        lines = '\n'.join([
+            json.dumps({"shape": "rectangle", "length": 2, "width": 3}),
+            json.dumps({"shape": "rectangle", "length": 10 ** 400, "width": 3})
+        ])
+        response = self.import_lines(lines)
+        self.assert400(response)
+        self.assertEqual(response.json['errors'], [
+                         {'line': 2, 'message': 'dimensions must be finite numbers'}])
+
+    def test_import_fail_wrong_user(self):
+        """
+        Given user id that does not belong to user, it should return status code 403
+        """
+        response = self.client.post(
+            f'/api/users/{self.user_id + 1}/import', headers={"Authorization": "Bearer " + constants.TOKEN_VALID}, data='')
+        self.assert403(response)
+
+
+class TestAllShapes(TestUser):
+
+    def setUp(self):
+        super().setUp()
+        db.session.add(Rectangle(user_id=self.user_id,
+                                 length=constants.NUMBER_VALID, width=constants.NUMBER_VALID2))
+        db.session.add(Rectangle(user_id=self.user_id,
+                                 length=constants.NUMBER_VALID, width=constants.NUMBER_VALID))
+        db.session.add(Triangle(user_id=self.user_id,
+                                length1=3, length2=4, length3=5))
+        db.session.add(Diamond(user_id=self.user_id,
+                               diagonal1=constants.NUMBER_VALID, diagonal2=constants.NUMBER_VALID2))
+        db.session.commit()
+
+    def test_get_shapes_success(self):
+        """
+        Given a limit, it should return pages of all the user's shapes, each as its own type
+        """
+        items = []
+        url = '/api/shapes?limit=3'
+        while url:
+            response = self.client.get(
+                url, headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+            self.assert200(response)
+            items += response.json['items']
+            url = response.json['_links']['next']
+        self.assertEqual([item['shape'] for item in items],
+                         ['rectangle', 'square', 'triangle', 'diamond'])
+        self.assertEqual(items[1]['length'], constants.NUMBER_VALID)
+        self.assertFalse('width' in items[1])
+        self.assertEqual(items[1]['_links']['self'], url_for(
+            'api.get_square', rectangle_id=items[1]['square_id']))
+        self.assertEqual(items[2]['length3'], 5)
+
+    def test_get_shapes_limits_each_table(self):
+        """
+        Given a cursor and a limit, it should page through the shapes one at a time, limiting every table in the database
+        """
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        shapes = []
+        url = '/api/shapes?limit=1'
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            while url:
+                response = self.client.get(
+                    url, headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+                self.assert200(response)
+                shapes += [item['shape'] for item in response.json['items']]
+                url = response.json['_links']['next']
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        self.assertEqual(shapes, ['rectangle', 'square', 'triangle', 'diamond'])
+        union = [statement for statement in statements if 'UNION ALL' in statement][0]
+        # One per table, and one for the page
+        self.assertEqual(union.count('LIMIT'), 4)
+
+    def test_get_shapes_without_links(self):
+        """
+        Given links=false, it should return the shapes without _links
+        """
+        response = self.client.get(
+            '/api/shapes?links=false', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert200(response)
+        self.assertEqual(len(response.json['items']), 4)
+        self.assertFalse(any('_links' in item for item in response.json['items']))
+
+
+class TestUserExport(TestUser):
+
+    def setUp(self):
+        super().setUp()
+        db.session.add(Rectangle(user_id=self.user_id,
+                                 length=constants.NUMBER_VALID, width=constants.NUMBER_VALID2))
+        db.session.add(Triangle(user_id=self.user_id,
+                                length1=3, length2=4, length3=5))
+        db.session.commit()
+
+    def test_export_success(self):
+        """
+        Given a user with shapes, it should stream one JSON object per shape without links
+        """
+        response = self.client.get(
+            f'/api/users/{self.user_id}/export', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert200(response)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = [json.loads(line) for line in response.data.splitlines()]
+        self.assertEqual([line['shape'] for line in lines],
+                         ['rectangle', 'triangle'])
+        self.assertEqual(lines[0]['width'], constants.NUMBER_VALID2)
+        self.assertEqual(lines[1]['area'], 6.0)
+        self.assertFalse('_links' in lines[0])
+        self.assertFalse('user_id' in lines[0])
+
+    def test_export_gzip(self):
+        """
+        Given Accept-Encoding gzip, it should stream the export gzip compressed
+        """
+        response = self.client.get(
+            f'/api/users/{self.user_id}/export', headers={"Authorization": "Bearer " + constants.TOKEN_VALID, "Accept-Encoding": "gzip"})
+        self.assert200(response)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            len(gzip.decompress(response.data).splitlines()), 2)
+
+    def test_export_since(self):
+        """
+        Given a since time, it should only export the shapes changed since then
+        """
+        rectangle = Rectangle.query.first()
+        rectangle.updated_at = datetime.utcnow() - timedelta(days=2)
+        db.session.commit()
+        since = (datetime.utcnow() - timedelta(days=1)).isoformat() + 'Z'
+        response = self.client.get(
+            f'/api/users/{self.user_id}/export?since={since}', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert200(response)
+        lines = [json.loads(line) for line in response.data.splitlines()]
+        self.assertEqual([line['shape'] for line in lines], ['triangle'])
+
+    def test_export_fail_invalid_since(self):
+        """
+        Given a since that is not a date, it should return status code 400 and proper error message
+        """
+        response = self.client.get(
+            f'/api/users/{self.user_id}/export?since=yesterday', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert400(response)
+        self.assertEqual(response.json['message'],
+                         'since must be an ISO 8601 date and time')
+
+    def test_export_fail_wrong_user(self):
+        """
+        Given user id that does not belong to user, it should return status code 403
+        """
+        response = self.client.get(
+            f'/api/users/{self.user_id + 1}/export', headers={"Authorization": "Bearer " + constants.TOKEN_VALID})
+        self.assert403(response)